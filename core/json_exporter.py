@@ -5,171 +5,177 @@ JSON导出器模块
 用于将角色数据导出为Legado阅读软件兼容的JSON格式
 """
 
+import io
 import json
 import time
-from typing import List, Dict, Any, Set
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Any, Set, Tuple, Callable, Iterator
+
+try:
+    import orjson
+except ImportError:
+    # orjson 为可选依赖，未安装时回退到标准库json
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    # ijson 为可选依赖，未安装时一次性读取整个文件
+    ijson = None
+
+# Legado导出项的必要字段
+REQUIRED_FIELDS = ('concurrentRate', 'contentType', 'enabledCookieJar', 'id', 'lastUpdateTime', 'name', 'url')
+_REQUIRED_FIELD_SET = frozenset(REQUIRED_FIELDS)
+
+# 可直接按数值排序的字段
+_NUMERIC_SORT_FIELDS = frozenset(('id', 'lastUpdateTime'))
+
+def _index_tts_url_parts(server_address: str, synth_port: Any, speed: float, volume: float) -> Tuple[str, str]:
+    """构建index-tts URL的角色名前后两段"""
+    # 构建基础URL
+    if server_address.startswith(('http://', 'https://')):
+        # 如果是完整的URL，直接使用
+        base_url = server_address.rstrip('/')
+    elif synth_port:
+        # 如果有端口号，添加端口
+        base_url = f"http://{server_address}:{synth_port}".rstrip('/')
+    else:
+        # 否则使用默认的HTTP
+        base_url = f"http://{server_address}".rstrip('/')
+    
+    # 不进行URL编码，保持原文输出
+    return base_url + "?text={{speakText}}&speaker=", f"&speed={speed}&volume={volume}"
+
+def _generic_url_parts(api_url: str, speed: float, volume: float) -> Tuple[str, str]:
+    """构建通用URL的角色名前后两段"""
+    base_url = api_url.rstrip('/')
+    
+    # 不进行URL编码，保持原文输出
+    return base_url + "/synthesize?text={{speakText}}&voice=", f"&speed={speed}&volume={volume}"
+
+@lru_cache(maxsize=32)
+def _compile_provider(provider_key: Tuple, speed: float, volume: float) -> Tuple[Callable[[str], str], str]:
+    """编译提供商的URL生成函数和显示名称，仅角色名在运行时拼接
+    
+    provider_key为(type, server_address, synth_port, api_url, custom_name)，
+    包含了所有影响输出的字段，编辑提供商后自然不会命中旧缓存。
+    """
+    provider_type, server_address, synth_port, api_url, custom_name = provider_key
+    
+    if provider_type == 'index-tts':
+        prefix, suffix = _index_tts_url_parts(server_address, synth_port, speed, volume)
+    else:
+        prefix, suffix = _generic_url_parts(api_url, speed, volume)
+    
+    # 构建显示名称
+    if custom_name:
+        display_name = f"{custom_name} - {provider_type}"
+    else:
+        display_name = provider_type
+    
+    return (lambda role: f"{prefix}{role}{suffix}"), display_name
 
 class JSONExporter:
     """JSON导出器"""
     
     def __init__(self):
         """初始化JSON导出器"""
-        self.used_ids = set()
+        # 下一个可用ID（时间戳基数 + 单调递增计数）
+        self._next_id = int(time.time() * 1000)
     
     def generate_json(self, roles: List[str], provider: Dict[str, Any], speed: float = 1.0, volume: float = 1.0) -> List[Dict[str, Any]]:
         """生成JSON数据"""
         try:
-            # 重置已使用ID集合
-            self.used_ids = set()
-            
-            # 获取提供商信息
-            provider_type = provider.get('type')
-            custom_name = provider.get('custom_name', '')
-            provider_name = provider.get('type', '')
-            
-            # 构建显示名称
-            if custom_name:
-                display_name = f"{custom_name} - {provider_name}"
-            else:
-                display_name = provider_name
+            # 入口处一次性校验，循环内不再逐项捕获异常
+            self._validate_provider(provider)
+            
+            # 循环外预先计算不变量：URL生成函数、显示名称和时间戳（相同配置重复导出时命中缓存）
+            provider_key = (
+                provider.get('type'),
+                provider.get('server_address'),
+                provider.get('synth_port'),
+                provider.get('api_url'),
+                provider.get('custom_name', '')
+            )
+            build_url, display_name = _compile_provider(provider_key, speed, volume)
+            now_ms = int(time.time() * 1000)
+            
+            # 以当前时间戳为ID基数，不早于已分配过的ID
+            base_id = max(now_ms, self._next_id)
             
             # 生成角色数据
             json_data = []
             
-            for role in roles:
-                try:
-                    role_data = self._create_role_data(role, display_name, provider, speed, volume)
-                    if role_data:
-                        json_data.append(role_data)
-                except Exception as e:
-                    print(f"生成角色数据失败 {role}: {e}")
+            for i, role in enumerate(roles):
+                json_data.append({
+                    "concurrentRate": "0",
+                    "contentType": "audio/wav",
+                    "enabledCookieJar": False,
+                    "id": base_id + i,
+                    "lastUpdateTime": now_ms,
+                    "name": f"{role}_{display_name}",
+                    "url": build_url(role)
+                })
+            
+            self._next_id = base_id + len(json_data)
             
             return json_data
             
         except Exception as e:
             raise Exception(f"生成JSON数据失败: {e}")
     
-    def _create_role_data(self, role: str, display_name: str, provider: Dict[str, Any], speed: float, volume: float) -> Dict[str, Any]:
-        """创建角色数据"""
-        try:
-            # 生成唯一ID
-            role_id = self._generate_unique_id()
-            
-            # 构建名称
-            name = f"{role}_{display_name}"
-            
-            # 构建URL
-            url = self._build_url(role, provider, speed, volume)
-            
-            # 创建角色数据
-            role_data = {
-                "concurrentRate": "0",
-                "contentType": "audio/wav",
-                "enabledCookieJar": False,
-                "id": role_id,
-                "lastUpdateTime": int(time.time() * 1000),
-                "name": name,
-                "url": url
-            }
-            
-            return role_data
-            
-        except Exception as e:
-            raise Exception(f"创建角色数据失败: {e}")
-    
     def _generate_unique_id(self) -> int:
         """生成唯一的正数时间戳ID"""
-        try:
-            # 生成时间戳ID
-            timestamp = int(time.time() * 1000)
-            
-            # 确保ID唯一性
-            while timestamp in self.used_ids:
-                timestamp += 1
-            
-            # 添加到已使用ID集合
-            self.used_ids.add(timestamp)
-            
-            return timestamp
-            
-        except Exception as e:
-            raise Exception(f"生成唯一ID失败: {e}")
+        role_id = self._next_id
+        self._next_id = role_id + 1
+        return role_id
     
-    def _build_url(self, role: str, provider: Dict[str, Any], speed: float, volume: float) -> str:
-        """构建URL"""
-        try:
-            provider_type = provider.get('type')
-            
-            if provider_type == 'index-tts':
-                return self._build_index_tts_url(role, provider, speed, volume)
-            elif provider_type == 'generic':
-                return self._build_generic_url(role, provider, speed, volume)
-            else:
-                raise Exception(f"不支持的提供商类型: {provider_type}")
-                
-        except Exception as e:
-            raise Exception(f"构建URL失败: {e}")
+    def _validate_provider(self, provider: Dict[str, Any]):
+        """导出前一次性校验提供商配置"""
+        provider_type = provider.get('type')
+        
+        if provider_type == 'index-tts':
+            if not provider.get('server_address'):
+                raise ValueError("服务器地址不能为空")
+        elif provider_type == 'generic':
+            if not provider.get('api_url'):
+                raise ValueError("API地址不能为空")
+        else:
+            raise ValueError(f"不支持的提供商类型: {provider_type}")
     
-    def _build_index_tts_url(self, role: str, provider: Dict[str, Any], speed: float, volume: float) -> str:
-        """构建index-tts URL"""
-        try:
-            server_address = provider.get('server_address')
-            synth_port = provider.get('synth_port')
-            
-            if not server_address:
-                raise Exception("服务器地址不能为空")
-            
-            # 构建基础URL
-            if server_address.startswith(('http://', 'https://')):
-                # 如果是完整的URL，直接使用
-                base_url = server_address.rstrip('/')
-            elif synth_port:
-                # 如果有端口号，添加端口
-                base_url = f"http://{server_address}:{synth_port}".rstrip('/')
-            else:
-                # 否则使用默认的HTTP
-                base_url = f"http://{server_address}".rstrip('/')
-            
-            # 构建完整URL - 不进行URL编码，保持原文输出
-            url = f"{base_url}?text={{{{speakText}}}}&speaker={role}&speed={speed}&volume={volume}"
-            
-            return url
-            
-        except Exception as e:
-            raise Exception(f"构建index-tts URL失败: {e}")
+    def _dumps_bytes(self, json_data: Any) -> bytes:
+        """序列化为UTF-8字节，优先使用orjson"""
+        if orjson is not None:
+            return orjson.dumps(json_data, option=orjson.OPT_INDENT_2)
+        return json.dumps(json_data, ensure_ascii=False, indent=2).encode('utf-8')
     
-    def _build_generic_url(self, role: str, provider: Dict[str, Any], speed: float, volume: float) -> str:
-        """构建通用URL"""
+    def export_to_file(self, json_data: List[Dict[str, Any]], file_path: str):
+        """导出到文件"""
         try:
-            api_url = provider.get('api_url')
-            
-            if not api_url:
-                raise Exception("API地址不能为空")
-            
-            # 构建基础URL
-            base_url = api_url.rstrip('/')
-            
-            # 构建参数
-            params = {
-                'text': '{{speakText}}',
-                'voice': role,
-                'speed': speed,
-                'volume': volume
-            }
-            
-            # 构建完整URL - 不进行URL编码，保持原文输出
-            url = f"{base_url}/synthesize?text={{{{speakText}}}}&voice={role}&speed={speed}&volume={volume}"
-            
-            return url
-            
+            # 直接写入字节，省去字符串再编码的过程
+            with open(file_path, 'wb') as f:
+                f.write(self._dumps_bytes(json_data))
+                
         except Exception as e:
-            raise Exception(f"构建通用URL失败: {e}")
+            raise Exception(f"导出到文件失败: {e}")
     
-    def export_to_file(self, json_data: List[Dict[str, Any]], file_path: str):
-        """导出到文件"""
+    def export_to_file_streaming(self, json_data: List[Dict[str, Any]], file_path: str):
+        """逐项流式导出到文件，避免一次性生成整个文档"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, ensure_ascii=False, indent=2)
+            with io.open(file_path, 'wb', buffering=1 << 20) as f:
+                if not json_data:
+                    f.write(b'[]')
+                    return
+                
+                f.write(b'[\n')
+                for i, item in enumerate(json_data):
+                    if i:
+                        f.write(b',\n')
+                    # 逐项缩进，输出格式与整体序列化一致
+                    f.write(b'  ' + self._dumps_bytes(item).replace(b'\n', b'\n  '))
+                f.write(b'\n]')
                 
         except Exception as e:
             raise Exception(f"导出到文件失败: {e}")
@@ -177,6 +183,8 @@ class JSONExporter:
     def export_to_string(self, json_data: List[Dict[str, Any]]) -> str:
         """导出到字符串"""
         try:
+            if orjson is not None:
+                return orjson.dumps(json_data, option=orjson.OPT_INDENT_2).decode('utf-8')
             return json.dumps(json_data, ensure_ascii=False, indent=2)
         except Exception as e:
             raise Exception(f"导出到字符串失败: {e}")
@@ -189,17 +197,16 @@ class JSONExporter:
             errors.append("JSON数据必须是数组")
             return errors
         
-        required_fields = ['concurrentRate', 'contentType', 'enabledCookieJar', 'id', 'lastUpdateTime', 'name', 'url']
-        
         for i, item in enumerate(json_data):
             if not isinstance(item, dict):
                 errors.append(f"第{i+1}项必须是对象")
                 continue
             
-            # 检查必要字段
-            for field in required_fields:
-                if field not in item:
-                    errors.append(f"第{i+1}项缺少必要字段: {field}")
+            # 检查必要字段（字段齐全时一次集合比较即可跳过逐项检查）
+            if not _REQUIRED_FIELD_SET <= item.keys():
+                for field in REQUIRED_FIELDS:
+                    if field not in item:
+                        errors.append(f"第{i+1}项缺少必要字段: {field}")
             
             # 验证ID
             if 'id' in item:
@@ -234,32 +241,35 @@ class JSONExporter:
             if not json_data:
                 return stats
             
-            # 分析数据
-            ids = []
+            # 单次遍历：同时统计ID范围、内容类型和URL协议
+            min_id = None
+            max_id = None
+            content_types = Counter()
+            url_protocols = Counter()
+            
             for item in json_data:
-                # 收集ID
-                if 'id' in item:
-                    ids.append(item['id'])
+                item_id = item.get('id')
+                if item_id is not None:
+                    if min_id is None or item_id < min_id:
+                        min_id = item_id
+                    if max_id is None or item_id > max_id:
+                        max_id = item_id
                 
-                # 统计内容类型
-                content_type = item.get('contentType', 'unknown')
-                stats['content_types'][content_type] = stats['content_types'].get(content_type, 0) + 1
+                content_types[item.get('contentType', 'unknown')] += 1
                 
-                # 统计URL协议
                 url = item.get('url', '')
                 if url.startswith('http://'):
-                    stats['url_protocols']['http'] = stats['url_protocols'].get('http', 0) + 1
+                    url_protocols['http'] += 1
                 elif url.startswith('https://'):
-                    stats['url_protocols']['https'] = stats['url_protocols'].get('https', 0) + 1
+                    url_protocols['https'] += 1
             
-            # 计算ID范围
-            if ids:
-                stats['id_range']['min'] = min(ids)
-                stats['id_range']['max'] = max(ids)
+            stats['id_range']['min'] = min_id
+            stats['id_range']['max'] = max_id
+            stats['content_types'] = dict(content_types)
+            stats['url_protocols'] = dict(url_protocols)
             
             # 估算文件大小
-            json_string = self.export_to_string(json_data)
-            stats['file_size_estimate'] = len(json_string.encode('utf-8'))
+            stats['file_size_estimate'] = len(self._dumps_bytes(json_data))
             
             return stats
             
@@ -282,34 +292,54 @@ class JSONExporter:
             backup_file = backup_path / f"tts_roles_backup_{timestamp}.json"
             
             # 导出备份
-            self.export_to_file(json_data, str(backup_file))
+            self.export_to_file_streaming(json_data, str(backup_file))
             
             return str(backup_file)
             
         except Exception as e:
             raise Exception(f"创建备份失败: {e}")
     
+    def _iter_json_array(self, file_path: str) -> Iterator[Any]:
+        """逐项读取JSON文件中的顶层数组，非数组内容不产生任何项"""
+        if ijson is not None:
+            # 流式解析，无需将整个文件载入内存
+            with open(file_path, 'rb') as f:
+                yield from ijson.items(f, 'item', use_float=True)
+            return
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        if isinstance(data, list):
+            yield from data
+    
     def merge_json_files(self, file_paths: List[str]) -> List[Dict[str, Any]]:
         """合并多个JSON文件"""
         try:
             merged_data = []
             existing_ids = set()
+            max_id = 0
             
             for file_path in file_paths:
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    file_items = []
+                    for item in self._iter_json_array(file_path):
+                        # 检查ID冲突
+                        if 'id' in item:
+                            if item['id'] in existing_ids:
+                                # 计数器一次性越过已有最大ID，无需逐个探测
+                                if self._next_id <= max_id:
+                                    self._next_id = max_id + 1
+                                # 生成新的ID
+                                item['id'] = self._generate_unique_id()
+                            existing_ids.add(item['id'])
+                            if isinstance(item['id'], int) and item['id'] > max_id:
+                                max_id = item['id']
+                        
+                        file_items.append(item)
                     
-                    if isinstance(data, list):
-                        for item in data:
-                            # 检查ID冲突
-                            if 'id' in item:
-                                if item['id'] in existing_ids:
-                                    # 生成新的ID
-                                    item['id'] = self._generate_unique_id()
-                                existing_ids.add(item['id'])
-                            
-                            merged_data.append(item)
+                    # 整个文件读取成功后再合并
+                    merged_data.extend(file_items)
                     
                 except Exception as e:
                     print(f"读取文件失败 {file_path}: {e}")
@@ -322,31 +352,30 @@ class JSONExporter:
     def filter_roles(self, json_data: List[Dict[str, Any]], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         """过滤角色"""
         try:
-            filtered_data = []
+            # 入口处一次性计算过滤条件，空条件视为不过滤
+            filter_name = filters.get('name', '').lower() or None
+            filter_url = filters.get('url', '').lower() or None
+            filter_type = filters.get('contentType') or None
             
+            # 没有任何过滤条件时直接返回
+            if not (filter_name or filter_url or filter_type):
+                return list(json_data)
+            
+            filtered_data = []
             for item in json_data:
-                include = True
-                
                 # 按名称过滤
-                if 'name' in filters:
-                    filter_name = filters['name'].lower()
-                    if filter_name and filter_name not in item.get('name', '').lower():
-                        include = False
+                if filter_name and filter_name not in item.get('name', '').lower():
+                    continue
                 
                 # 按URL过滤
-                if 'url' in filters:
-                    filter_url = filters['url'].lower()
-                    if filter_url and filter_url not in item.get('url', '').lower():
-                        include = False
+                if filter_url and filter_url not in item.get('url', '').lower():
+                    continue
                 
                 # 按内容类型过滤
-                if 'contentType' in filters:
-                    filter_type = filters['contentType']
-                    if filter_type and item.get('contentType') != filter_type:
-                        include = False
+                if filter_type and item.get('contentType') != filter_type:
+                    continue
                 
-                if include:
-                    filtered_data.append(item)
+                filtered_data.append(item)
             
             return filtered_data
             
@@ -356,6 +385,14 @@ class JSONExporter:
     def sort_roles(self, json_data: List[Dict[str, Any]], sort_by: str = 'name', reverse: bool = False) -> List[Dict[str, Any]]:
         """排序角色"""
         try:
+            # 数值字段直接用C实现的itemgetter作为排序键
+            if sort_by in _NUMERIC_SORT_FIELDS:
+                try:
+                    return sorted(json_data, key=itemgetter(sort_by), reverse=reverse)
+                except (KeyError, TypeError):
+                    # 存在缺失或非数值字段时按通用方式排序
+                    pass
+            
             def sort_key(item):
                 value = item.get(sort_by, '')
                 if isinstance(value, str):
@@ -370,16 +407,12 @@ class JSONExporter:
     def deduplicate_roles(self, json_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """去重角色"""
         try:
-            seen_names = set()
-            unique_data = []
-            
+            # 按名称保留第一次出现的项（dict保持插入顺序）
+            seen = {}
             for item in json_data:
-                name = item.get('name', '')
-                if name not in seen_names:
-                    seen_names.add(name)
-                    unique_data.append(item)
+                seen.setdefault(item.get('name', ''), item)
             
-            return unique_data
+            return list(seen.values())
             
         except Exception as e:
             raise Exception(f"去重角色失败: {e}")
\ No newline at end of file
@@ -5,13 +5,24 @@
 用于发现和验证局域网内的TTS服务器
 """
 
+import errno
+import json
+import heapq
+import itertools
+import os
+import shutil
 import socket
-import threading
+import selectors
+import struct
+import subprocess
 import time
-import ipaddress
-import wx
-from typing import List, Dict, Any, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Mapping, NamedTuple
+from functools import lru_cache
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 def safe_print(message: str) -> None:
     """安全打印函数，处理编码问题"""
@@ -25,13 +36,134 @@ def safe_print(message: str) -> None:
 try:
     from gradio_client import Client
 except ImportError:
+    Client = None
     safe_print("Warning: gradio_client not installed, network scanning will be limited")
 
+try:
+    import icmplib
+except ImportError:
+    icmplib = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from core.provider_manager import ProviderManager
 from utils.network_info import get_primary_network_segment, NetworkInfo
 from utils.logger import get_logger
 
 logger = get_logger()
 
+# 非阻塞connect正在进行中的错误码（Windows下为WSAEWOULDBLOCK）
+_CONNECT_IN_PROGRESS = {
+    code for code in (
+        errno.EINPROGRESS,
+        errno.EWOULDBLOCK,
+        errno.EALREADY,
+        getattr(errno, 'WSAEWOULDBLOCK', None)
+    ) if code is not None
+}
+
+# 连接被拒绝的错误码：端口关闭但主机在线
+_CONNECT_REFUSED = {
+    code for code in (
+        errno.ECONNREFUSED,
+        getattr(errno, 'WSAECONNREFUSED', None)
+    ) if code is not None
+}
+
+# Linux下创建socket时直接带上SOCK_NONBLOCK，省去每个探测socket单独的fcntl调用
+_SOCK_NONBLOCK = getattr(socket, 'SOCK_NONBLOCK', 0)
+
+# 探测socket只发起连接不传数据，用小缓冲区降低大量并发连接时的内核内存占用
+_PROBE_BUFFER_SIZE = 4096
+
+# SO_LINGER开启且超时为0：close()直接发送RST，连接不进入TIME_WAIT
+# （Windows的linger结构为两个u_short，其他平台为两个int）
+_LINGER_ABORT = struct.pack('HH' if os.name == 'nt' else 'ii', 1, 0)
+
+def _configure_probe_socket(sock: socket.socket) -> None:
+    """为探测socket关闭Nagle算法、缩小收发缓冲区，并在关闭时直接复位连接"""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _PROBE_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _PROBE_BUFFER_SIZE)
+    # 探测socket从不收发数据，复位连接是安全的，可避免反复扫描耗尽临时端口
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_ABORT)
+
+# 扫描发现的服务器在此时长内（秒）视为仍可能在线，下次扫描优先验证
+_DISCOVERED_SERVER_TTL = 7 * 24 * 3600
+
+# 快速模式下因已发现服务器仍可用而跳过网络扫描的最长时间（秒），超过后重新扫描以发现新服务器
+_SWEEP_SKIP_TTL = 3600
+
+# 主机名解析结果缓存时长（秒）
+_DNS_CACHE_TTL = 900
+
+# gradio客户端缓存时长（秒），避免重复扫描时反复下载接口描述
+_GRADIO_CLIENT_TTL = 300
+
+# index-tts默认端口
+_INDEX_TTS_PORTS = MappingProxyType({
+    'web': 7860,
+    'synth': 9880
+})
+
+# 端口说明，get_port_info直接返回，不再每次构造
+_PORT_INFO = MappingProxyType({
+    7860: MappingProxyType({
+        'name': 'Gradio Web Interface',
+        'description': 'index-tts Web界面端口',
+        'protocol': 'HTTP'
+    }),
+    9880: MappingProxyType({
+        'name': 'Synthesis Interface',
+        'description': 'index-tts合成接口端口',
+        'protocol': 'HTTP'
+    })
+})
+
+# 没有可扫描网段时的默认IP：只搜索本机回环地址作为最后的备用方案
+_DEFAULT_IPS = ("127.0.0.1",)
+
+# ICMP回显请求/应答类型
+_ICMP_ECHO_REQUEST = 8
+_ICMP_ECHO_REPLY = 0
+
+def _icmp_checksum(data: bytes) -> int:
+    """计算ICMP校验和（16位反码和）"""
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+# IP最后一段0-255预先转成字符串，拼接IP时直接按下标取用
+_OCTETS = tuple(map(str, range(256)))
+
+# 端口探测结果
+PORT_OPEN = 'open'
+PORT_REFUSED = 'refused'
+PORT_TIMEOUT = 'timeout'
+
+@lru_cache(maxsize=64)
+def _estimate_scan_seconds(ip_count: int, timeout: float, max_threads: int) -> float:
+    """按IP数量、超时和并发数估算扫描耗时（秒）"""
+    # 基于当前配置估算时间
+    time_per_ip = timeout * 0.8  # 考虑并行优化
+    total_time = ip_count * time_per_ip
+    
+    # 考虑线程池并发
+    concurrent_factor = min(max_threads, ip_count)
+    return total_time / concurrent_factor
+
+class Host(NamedTuple):
+    """端口扫描发现的存活主机，端口未开放时为None"""
+    address: str
+    web_port: Optional[int]
+    synth_port: Optional[int]
+
 class NetworkScanner:
     """高性能网络扫描器
     
@@ -72,16 +204,47 @@ class NetworkScanner:
         """初始化网络扫描器"""
         self.timeout = 1.0  # 减少超时时间，提高扫描速度
         self.max_threads = 150  # 增加线程数，加速扫描
+        self.max_sockets = 256  # 同时在途的探测socket数量（Windows下select上限为512）
         
-        # index-tts 端口
-        self.index_tts_ports = {
-            'web': 7860,
-            'synth': 9880
-        }
+        # index-tts 端口（只读，所有实例共享）
+        self.index_tts_ports = _INDEX_TTS_PORTS
         
         # 网络信息获取器
         self.network_info = NetworkInfo()
         
+        # 验证用的HTTP会话：复用连接池，探测失败不重试
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+        self._session.mount('http://', adapter)
+        
+        # 是否在HTTP探测失败后回退到gradio客户端验证（需下载接口描述，较慢）
+        self.use_gradio_client = False
+        
+        # 端口扫描前是否先用ICMP过滤不在线的主机（Windows防火墙默认屏蔽ICMP，因此默认关闭）
+        self.icmp_sweep = False
+        
+        # gradio客户端缓存：(IP, 端口) -> (客户端, 过期时间)
+        self._gradio_cache = {}
+        
+        # 网段 -> 该网段全部主机地址
+        self._segment_ip_cache = {}
+        
+        # 主机名解析缓存：主机名 -> (IPv4地址, 过期时间)
+        self._dns_cache = {}
+        
+        # 上次扫描生成的IP数量，供estimate_scan_time直接使用
+        self._last_ip_count = None
+        
+        # 历次扫描发现的服务器记录
+        self.known_servers_file = Path("config/known_servers.json")
+        
+        # 已知服务器缓存，方案变更时通过invalidate_known_servers()清除，
+        # 配置文件修改时间变化时也会自动重新读取；
+        # 界面共享主窗口的同一个扫描器实例，缓存才能在多次搜索之间生效
+        self._known_cache = None
+        self._known_mtime = None
+        self._provider_manager = None
+        
         logger.debug("网络扫描器初始化完成（稳定性优化模式）")
     
     def scan_index_tts_servers(self, fast_mode: bool = True) -> List[Dict[str, Any]]:
@@ -92,62 +255,75 @@ class NetworkScanner:
             
             servers = []
             
-            # 策略1：首先检查已知的服务器（从配置中）
+            # 策略1：首先检查已知的服务器（从配置中）和之前扫描发现的服务器
             known_servers = self._get_known_servers()
-            if known_servers:
-                logger.info(f"检查 {len(known_servers)} 个已知服务器")
-                servers.extend(self._verify_servers(known_servers))
+            known_addresses = {server['address'] for server in known_servers}
+            discovered_servers, last_sweep = self._load_discovered_servers()
+            discovered_servers = [
+                server for server in discovered_servers
+                if server['address'] not in known_addresses
+            ]
+            candidates = known_servers + discovered_servers
+            if candidates:
+                logger.info(f"检查 {len(candidates)} 个已知服务器")
+                servers.extend(self._verify_servers(candidates))
+            
+            # 之前发现的服务器仍然可用时，说明网络环境未变，快速模式下无需重新扫描；
+            # 但距上次网络扫描超过_SWEEP_SKIP_TTL时仍要扫描，以便发现新服务器
+            discovered_addresses = {server['address'] for server in discovered_servers}
+            rediscovered = (
+                time.time() - last_sweep < _SWEEP_SKIP_TTL
+                and any(server['address'] in discovered_addresses for server in servers)
+            )
             
             # 根据模式决定是否进行网络扫描
-            if fast_mode and len(servers) >= 2:
-                logger.info("快速模式：已找到足够的服务器，跳过网络扫描")
+            swept = False
+            if fast_mode and (len(servers) >= 2 or rediscovered):
+                logger.info("已找到足够的服务器，跳过网络扫描")
             else:
+                swept = True
                 if fast_mode:
                     logger.info("快速模式：服务器不足，开始智能网络扫描")
                 else:
                     logger.info("全网段扫描模式：开始完整网络扫描")
                 
-                # 获取要扫描的IP列表（使用智能过滤）
-                ip_list = self._get_scan_ips()
-                
-                if not ip_list:
-                    logger.warning("没有可扫描的IP地址")
-                    return servers
-                
-                # 扫描端口
-                live_hosts = self._scan_ports(ip_list)
+                # 扫描端口（IP按智能过滤策略逐个生成）
+                live_hosts = self._scan_ports(self._get_scan_ips())
                 logger.debug(f"发现 {len(live_hosts)} 个存活主机")
                 
                 # 验证服务
-                scanned_servers = self._verify_servers(live_hosts)
-                servers.extend(scanned_servers)
+                servers.extend(self._verify_servers(live_hosts))
             
-            # 去重
-            unique_servers = []
-            seen_addresses = set()
+            # 按地址去重（保持发现顺序，同一地址以先出现的记录为准，配置中的端口优先于扫描结果）
+            seen = {}
             for server in servers:
-                address = server['address']
-                if address not in seen_addresses:
-                    seen_addresses.add(address)
-                    unique_servers.append(server)
+                seen.setdefault(server['address'], server)
+            unique_servers = list(seen.values())
+            
+            # 记录本次可用的服务器（及网络扫描时间），供下次扫描优先验证
+            if unique_servers or swept:
+                self._save_discovered_servers(unique_servers, swept)
             
             logger.info(f"{mode_text}完成，找到 {len(unique_servers)} 个服务器")
             return unique_servers
             
         except Exception as e:
             logger.error(f"扫描服务器失败: {e}")
+            safe_print(f"扫描服务器失败: {e}")
             return []
     
     def _get_known_servers(self) -> List[Dict[str, Any]]:
-        """从配置中获取已知的服务器"""
+        """从配置中获取已知的服务器（结果缓存在实例上）"""
+        mtime = self._providers_mtime()
+        if self._known_cache is not None and mtime == self._known_mtime:
+            return self._known_cache
+        
         try:
             known_servers = []
             
             # 从当前配置中获取服务器
             try:
-                from core.provider_manager import ProviderManager
-                provider_manager = ProviderManager()
-                providers = provider_manager.get_all_providers()
+                providers = self._get_provider_manager().get_all_providers()
                 
                 for provider in providers:
                     if provider.get('enabled', True) and provider.get('server_address'):
@@ -157,7 +333,8 @@ class NetworkScanner:
                             'synth_port': provider.get('synth_port', 9880)
                         }
                         known_servers.append(server)
-                        logger.debug(f"添加已知服务器: {server['address']}:{server['web_port']}")
+                        if logger.debug_mode:
+                            logger.debug(f"添加已知服务器: {server['address']}:{server['web_port']}")
             except Exception as e:
                 logger.debug(f"获取已知服务器失败: {e}")
             
@@ -169,22 +346,100 @@ class NetworkScanner:
             }
             known_servers.append(local_server)
             
+            self._known_cache = known_servers
+            self._known_mtime = mtime
             return known_servers
             
         except Exception as e:
             logger.debug(f"获取已知服务器失败: {e}")
             return []
     
+    def _load_discovered_servers(self) -> Tuple[List[Dict[str, Any]], float]:
+        """加载之前扫描发现且未过期的服务器，以及上次网络扫描的时间（从未扫描时为0）"""
+        try:
+            if not self.known_servers_file.exists():
+                return [], 0.0
+            
+            with open(self.known_servers_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            cutoff = time.time() - _DISCOVERED_SERVER_TTL
+            servers = [
+                {
+                    'address': record['address'],
+                    'web_port': record.get('web_port'),
+                    'synth_port': record.get('synth_port')
+                }
+                for record in data.get('servers', [])
+                if record.get('address') and record.get('ts', 0) >= cutoff
+            ]
+            return servers, data.get('last_sweep', 0.0)
+            
+        except Exception as e:
+            logger.debug(f"加载已发现服务器失败: {e}")
+            return [], 0.0
+    
+    def _save_discovered_servers(self, servers: List[Dict[str, Any]], swept: bool = False):
+        """保存可用的服务器及发现时间，与文件中未过期的记录合并
+        
+        swept: 本次是否进行了网络扫描，是则记录扫描时间，否则保留上次的扫描时间
+        """
+        try:
+            now = time.time()
+            cutoff = now - _DISCOVERED_SERVER_TTL
+            records = {}
+            last_sweep = 0.0
+            
+            if self.known_servers_file.exists():
+                with open(self.known_servers_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                last_sweep = data.get('last_sweep', 0.0)
+                for record in data.get('servers', []):
+                    if record.get('address') and record.get('ts', 0) >= cutoff:
+                        records[record['address']] = record
+            
+            for server in servers:
+                records[server['address']] = {
+                    'address': server['address'],
+                    'web_port': server.get('web_port'),
+                    'synth_port': server.get('synth_port'),
+                    'ts': now
+                }
+            
+            if swept:
+                last_sweep = now
+            
+            self.known_servers_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.known_servers_file, 'w', encoding='utf-8') as f:
+                json.dump({'last_sweep': last_sweep, 'servers': list(records.values())}, f, ensure_ascii=False, indent=2)
+                
+        except Exception as e:
+            logger.debug(f"保存已发现服务器失败: {e}")
+    
+    def _get_provider_manager(self) -> ProviderManager:
+        """获取（首次使用时创建）提供商管理器"""
+        if self._provider_manager is None:
+            self._provider_manager = ProviderManager()
+        return self._provider_manager
+    
+    def _providers_mtime(self) -> Optional[int]:
+        """方案配置文件的修改时间，用于判断已知服务器缓存是否过期"""
+        try:
+            return os.stat(self._get_provider_manager().config_file).st_mtime_ns
+        except Exception:
+            return None
+    
+    def invalidate_known_servers(self):
+        """清除已知服务器缓存，方案增删改后调用"""
+        self._known_cache = None
+    
     def scan_network(self, segment: str) -> List[Dict[str, Any]]:
         """扫描指定网段的服务器"""
         try:
             logger.info(f"开始扫描网段: {segment}")
             
             # 生成IP列表
-            ip_list = []
-            for i in range(1, 256):
-                ip = f"{segment}.{i}"
-                ip_list.append(ip)
+            ip_list = self._segment_hosts(segment)
             
             logger.log_network_operation("扫描开始", f"扫描 {len(ip_list)} 个IP地址")
             
@@ -200,12 +455,13 @@ class NetworkScanner:
             
         except Exception as e:
             logger.error(f"扫描网段失败: {e}")
+            safe_print(f"扫描网段失败: {e}")
             return []
     
     def scan_and_select_server(self) -> Optional[Dict[str, Any]]:
         """扫描并让用户选择服务器"""
         try:
-            # 扫描服务器（使用智能过滤）
+            # 扫描服务器（使用智能过滤），不限制数量，多个服务器时由用户选择
             servers = self.scan_index_tts_servers()
             
             if not servers:
@@ -216,10 +472,12 @@ class NetworkScanner:
                 # 只有一个服务器，直接返回
                 return servers[0]
             else:
-                # 多个服务器，返回服务器列表让调用者处理UI
+                # 多个服务器，补齐状态后返回服务器列表让调用者处理UI
+                self._fill_server_status(servers)
                 return servers
                 
         except Exception as e:
+            logger.error(f"扫描服务器失败: {e}")
             safe_print(f"扫描服务器失败: {e}")
             return None
     
@@ -228,6 +486,7 @@ class NetworkScanner:
         try:
             return self.scan_index_tts_servers()
         except Exception as e:
+            logger.error(f"扫描服务器失败: {e}")
             safe_print(f"扫描服务器失败: {e}")
             return []
     
@@ -251,123 +510,19 @@ class NetworkScanner:
             return scan_info
             
         except Exception as e:
+            logger.error(f"获取扫描信息失败: {e}")
             safe_print(f"获取扫描信息失败: {e}")
             return {}
     
-    def estimate_scan_time(self, ip_count: int = None) -> Dict[str, float]:
-        """估算扫描时间 - 基于智能过滤"""
-        try:
-            if ip_count is None:
-                # 使用智能过滤的性能预估
-                filtered_data = self.network_info.get_filtered_network_segments()
-                ip_count = filtered_data['performance_estimate']['total_ips']
-            
-            # 基于当前配置估算时间
-            time_per_ip = self.timeout * 0.8  # 考虑并行优化
-            total_time = ip_count * time_per_ip
-            
-            # 考虑线程池并发
-            concurrent_factor = min(self.max_threads, ip_count)
-            estimated_time = total_time / concurrent_factor
-            
-            return {
-                'estimated_seconds': estimated_time,
-                'estimated_minutes': estimated_time / 60,
-                'ip_count': ip_count,
-                'threads': self.max_threads,
-                'timeout': self.timeout
-            }
-            
-        except Exception as e:
-            safe_print(f"估算扫描时间失败: {e}")
-            return {
-                'estimated_seconds': 0,
-                'estimated_minutes': 0,
-                'ip_count': 0,
-                'threads': self.max_threads,
-                'timeout': self.timeout
-            }
-    
-    def _let_user_choose_server(self, servers: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-        """让用户选择服务器"""
-        try:
-            import wx
-            
-            # 创建选择对话框 - 使用最简单的方式
-            dialog = wx.Dialog(None, title="选择TTS服务器", style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
-            
-            # 直接在dialog上创建控件，不使用panel
-            sizer = wx.BoxSizer(wx.VERTICAL)
-            
-            # 添加提示文本
-            prompt = wx.StaticText(dialog, label="找到多个TTS服务器，请选择一个：")
-            sizer.Add(prompt, 0, wx.ALL, 10)
-            
-            # 添加服务器列表
-            list_ctrl = wx.ListCtrl(dialog, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
-            list_ctrl.InsertColumn(0, "地址", width=120)
-            list_ctrl.InsertColumn(1, "Web端口", width=80)
-            list_ctrl.InsertColumn(2, "合成端口", width=80)
-            list_ctrl.InsertColumn(3, "状态", width=80)
-            
-            # 添加服务器到列表
-            for i, server in enumerate(servers):
-                address = server['address']
-                web_port = str(server.get('web_port', 'N/A'))
-                synth_port = str(server.get('synth_port', 'N/A'))
-                
-                # 检查服务器状态
-                status = "可用" if self._check_server_status(server) else "不可用"
-                
-                index = list_ctrl.InsertItem(i, address)
-                list_ctrl.SetItem(index, 1, web_port)
-                list_ctrl.SetItem(index, 2, synth_port)
-                list_ctrl.SetItem(index, 3, status)
-            
-            sizer.Add(list_ctrl, 1, wx.EXPAND | wx.LEFT | wx.RIGHT, 10)
-            
-            # 添加按钮 - 使用dialog作为父窗口
-            button_sizer = wx.BoxSizer(wx.HORIZONTAL)
-            
-            # 创建确定按钮
-            ok_button = wx.Button(dialog, wx.ID_OK, "确定")
-            button_sizer.Add(ok_button, 0, wx.RIGHT, 5)
-            
-            # 创建取消按钮
-            cancel_button = wx.Button(dialog, wx.ID_CANCEL, "取消")
-            button_sizer.Add(cancel_button, 0, wx.LEFT, 5)
-            
-            sizer.Add(button_sizer, 0, wx.ALIGN_CENTER | wx.ALL, 10)
-            
-            # 设置dialog的sizer
-            dialog.SetSizer(sizer)
-            
-            # 设置对话框大小
-            dialog.SetSize((500, 300))
-            
-            # 绑定键盘事件，支持回车键确定
-            list_ctrl.Bind(wx.EVT_KEY_DOWN, lambda event: self._on_list_key_down(event, dialog, servers, list_ctrl))
-            
-            # 自动将焦点设置到第一行（如果有的话）
-            if list_ctrl.GetItemCount() > 0:
-                list_ctrl.SetItemState(0, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED)
-            
-            # 显示对话框
-            if dialog.ShowModal() == wx.ID_OK:
-                selected_index = list_ctrl.GetFirstSelected()
-                if selected_index != -1:
-                    chosen_server = servers[selected_index]
-                    dialog.Destroy()
-                    return chosen_server
-                else:
-                    wx.MessageBox("请先选择一个服务器", "提示", wx.OK | wx.ICON_INFORMATION)
-            
-            dialog.Destroy()
-            return None
-            
-        except Exception as e:
-            safe_print(f"显示服务器选择对话框失败: {e}")
-            return None
+    def _fill_server_status(self, servers: List[Dict[str, Any]]):
+        """为尚无状态的服务器并发检查端口，写入server['status']"""
+        pending = [server for server in servers if 'status' not in server]
+        if not pending:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(len(pending), 16)) as executor:
+            for server, ok in zip(pending, executor.map(self._check_server_status, pending)):
+                server['status'] = "可用" if ok else "不可用"
     
     def _check_server_status(self, server: Dict[str, Any]) -> bool:
         """检查服务器状态"""
@@ -387,70 +542,74 @@ class NetworkScanner:
             return False
             
         except Exception as e:
-            safe_print(f"检查服务器状态失败: {e}")
+            if logger.debug_mode:
+                logger.debug(f"检查服务器状态失败: {e}")
             return False
     
-    def _get_scan_ips(self) -> List[str]:
-        """获取要扫描的IP列表 - 使用智能网段过滤策略"""
-        ip_list = []
+    def _get_scan_ips(self) -> Iterator[str]:
+        """逐个生成要扫描的IP，生成完毕后记录IP数量供扫描时间估算使用"""
+        count = 0
+        for ip in self._iter_scan_ips():
+            count += 1
+            yield ip
         
+        self._last_ip_count = count
+    
+    def _iter_scan_ips(self) -> Iterator[str]:
+        """逐个生成要扫描的IP，生成过程中出错时补充默认IP列表"""
         try:
-            # 使用智能网段过滤获取扫描策略
-            filtered_data = self.network_info.get_filtered_network_segments()
-            segments_to_scan = filtered_data['segments_to_scan']
-            
-            if not segments_to_scan:
-                logger.warning("没有可扫描的网段，使用默认IP列表")
-                ip_list.extend(self._get_default_ips())
-                return ip_list
-            
-            logger.info(f"开始智能扫描，共 {len(segments_to_scan)} 个网段需要扫描")
-            
-            # 按扫描策略生成IP列表
-            for segment_info in segments_to_scan:
-                segment = segment_info['segment']
-                scan_mode = segment_info['mode']
-                scan_range = segment_info['scan_range']
-                reason = segment_info['reason']
-                
-                logger.info(f"扫描网段: {segment} ({scan_mode}模式) - {reason}")
-                
-                if scan_mode == 'FULL':
-                    # 完整扫描：1-255
-                    segment_ips = self._scan_segment_with_strategy(segment)
-                    ip_list.extend(segment_ips)
-                    logger.info(f"  完整扫描: {segment} (共{len(segment_ips)}个IP)")
-                    
-                elif scan_mode == 'FAST':
-                    # 快速扫描：关键IP范围
-                    fast_ips = []
-                    if isinstance(scan_range, list):
-                        # 多个范围
-                        for range_start, range_end in scan_range:
-                            for i in range(range_start, range_end + 1):
-                                fast_ips.append(f"{segment}.{i}")
-                    else:
-                        # 单个范围
-                        range_start, range_end = scan_range
-                        for i in range(range_start, range_end + 1):
-                            fast_ips.append(f"{segment}.{i}")
-                    
-                    ip_list.extend(fast_ips)
-                    logger.info(f"  快速扫描: {segment} (共{len(fast_ips)}个IP)")
-            
-            # 记录性能预估
-            performance = filtered_data['performance_estimate']
-            logger.info(f"智能扫描策略生成完成:")
-            logger.info(f"  总IP数量: {performance['total_ips']}")
-            logger.info(f"  预估扫描时间: {performance['scan_time']:.1f}秒")
-            logger.info(f"  节省时间: {performance['time_saved'] * 0.1:.1f}秒")
-            
+            yield from self._iter_strategy_ips()
         except Exception as e:
             logger.error(f"获取智能扫描IP列表失败: {e}")
-            ip_list.extend(self._get_default_ips())
+            safe_print(f"获取智能扫描IP列表失败: {e}")
+            yield from self._get_default_ips()
+    
+    def _iter_strategy_ips(self) -> Iterator[str]:
+        """逐个生成要扫描的IP - 使用智能网段过滤策略"""
+        # 使用智能网段过滤获取扫描策略
+        filtered_data = self.network_info.get_filtered_network_segments()
+        segments_to_scan = filtered_data['segments_to_scan']
+        
+        if not segments_to_scan:
+            logger.warning("没有可扫描的网段，使用默认IP列表")
+            safe_print("没有可扫描的网段，使用默认IP列表")
+            yield from self._get_default_ips()
+            return
+        
+        logger.info(f"开始智能扫描，共 {len(segments_to_scan)} 个网段需要扫描")
+        
+        # 按扫描策略生成IP
+        for segment_info in segments_to_scan:
+            segment = segment_info['segment']
+            scan_mode = segment_info['mode']
+            scan_range = segment_info['scan_range']
+            reason = segment_info['reason']
+            
+            logger.info(f"扫描网段: {segment} ({scan_mode}模式) - {reason}")
+            
+            if scan_mode == 'FULL':
+                # 完整扫描：1-254
+                segment_ips = self._scan_segment_with_strategy(segment)
+                logger.info(f"  完整扫描: {segment} (共{len(segment_ips)}个IP)")
+                yield from segment_ips
+                
+            elif scan_mode == 'FAST':
+                # 快速扫描：关键IP范围（单个范围或多个范围）
+                ranges = scan_range if isinstance(scan_range, list) else [scan_range]
+                fast_count = sum(range_end - range_start + 1 for range_start, range_end in ranges)
+                logger.info(f"  快速扫描: {segment} (共{fast_count}个IP)")
+                
+                prefix = segment + '.'
+                for range_start, range_end in ranges:
+                    for i in range(range_start, range_end + 1):
+                        yield prefix + _OCTETS[i]
         
-        logger.debug(f"生成IP列表: {len(ip_list)} 个地址")
-        return ip_list
+        # 记录性能预估
+        performance = filtered_data['performance_estimate']
+        logger.info(f"智能扫描策略生成完成:")
+        logger.info(f"  总IP数量: {performance['total_ips']}")
+        logger.info(f"  预估扫描时间: {performance['scan_time']:.1f}秒")
+        logger.info(f"  节省时间: {performance['time_saved'] * 0.1:.1f}秒")
     
     def _scan_segment_with_strategy(self, segment: str) -> List[str]:
         """使用智能策略扫描指定网段 - 全网段扫描"""
@@ -458,142 +617,329 @@ class NetworkScanner:
         
         # 添加本机IP到扫描列表（优先级最高）
         try:
-            from utils.network_info import NetworkInfo
-            ni = NetworkInfo()
-            adapters = ni.get_network_adapters()
+            adapters = self.network_info.get_network_adapters()
             for adapter in adapters:
                 for ip in adapter['ipv4']:
-                    if ip.startswith(segment):
+                    if ip.startswith(segment + '.'):
                         priority_ips.append(ip)
-                        logger.debug(f"添加本机IP到扫描列表: {ip}")
+                        if logger.debug_mode:
+                            logger.debug(f"添加本机IP到扫描列表: {ip}")
         except Exception as e:
             logger.debug(f"获取本机IP失败: {e}")
         
-        # 全网段扫描：1-255
-        for i in range(1, 256):
-            ip = f"{segment}.{i}"
-            if ip not in priority_ips:  # 避免重复本机IP
-                priority_ips.append(ip)
+        # 全网段扫描：1-254，避免重复本机IP
+        seen = set(priority_ips)
+        priority_ips.extend(ip for ip in self._segment_hosts(segment) if ip not in seen)
         
         logger.debug(f"生成网段 {segment} 的完整扫描列表: {len(priority_ips)} 个IP")
         return priority_ips
     
-    def _get_default_ips(self) -> List[str]:
+    def _segment_hosts(self, segment: str) -> List[str]:
+        """生成/24网段内的全部主机地址（不含网络地址和广播地址），按网段缓存"""
+        hosts = self._segment_ip_cache.get(segment)
+        if hosts is None:
+            prefix = segment + '.'
+            hosts = self._segment_ip_cache[segment] = tuple(prefix + octet for octet in _OCTETS[1:255])
+        return list(hosts)
+    
+    def _get_default_ips(self) -> Tuple[str, ...]:
         """获取默认扫描IP列表"""
-        default_ips = []
+        return _DEFAULT_IPS
+    
+    def _scan_ports(self, ip_list: Iterable[str]) -> List[Dict[str, Any]]:
+        """扫描端口 - 单线程非阻塞批量探测，IP可按需逐个生成"""
+        logger.debug("开始扫描端口")
+        logger.log_network_operation("扫描开始", "全网段扫描")
         
-        # 只搜索本机回环地址作为最后的备用方案
-        default_ips.append("127.0.0.1")
+        if self.icmp_sweep:
+            ip_list = self._filter_alive_ips(ip_list)
         
-        return default_ips
+        live_hosts = self._scan_ports_epoll(ip_list)
+        
+        logger.log_network_operation("扫描完成", f"发现 {len(live_hosts)} 个存活主机")
+        return live_hosts
     
-    def _scan_ports(self, ip_list: List[str]) -> List[Dict[str, Any]]:
-        """扫描端口 - 优化多线程性能"""
-        live_hosts = []
-        total_ips = len(ip_list)
-        completed = 0
+    def _filter_alive_ips(self, ip_list: Iterable[str]) -> List[str]:
+        """用ICMP扫描预先过滤掉不在线的IP，无法发送ICMP时保留全部IP"""
+        ip_list = list(ip_list)
+        alive = self._icmp_sweep(ip_list)
+        if alive is None:
+            return ip_list
+        
+        # 本机回环地址始终保留
+        filtered = [ip for ip in ip_list if ip in alive or ip == '127.0.0.1']
+        logger.debug(f"ICMP预扫描: {len(ip_list)} 个IP中 {len(filtered)} 个在线")
+        return filtered
+    
+    def _icmp_sweep(self, ip_list: List[str]) -> Optional[set]:
+        """ICMP批量探测在线主机：优先使用fping，其次使用非特权ICMP socket
         
-        logger.debug(f"开始扫描 {total_ips} 个IP的端口")
-        logger.log_network_operation("扫描开始", f"全网段扫描 {total_ips} 个IP地址")
+        两种方式都不可用时返回None
+        """
+        if not ip_list:
+            return set()
         
-        # 使用线程池加速扫描
-        with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
-            # 提交扫描任务
-            future_to_ip = {
-                executor.submit(self._check_host_ports, ip): ip 
-                for ip in ip_list
-            }
+        if shutil.which('fping'):
+            try:
+                return self._fping_sweep(ip_list)
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.debug(f"fping执行失败: {e}")
+        
+        try:
+            return self._icmp_socket_sweep(ip_list)
+        except OSError as e:
+            logger.debug(f"无法创建ICMP socket: {e}")
+            return None
+    
+    def _fping_sweep(self, ip_list: List[str]) -> set:
+        """调用fping一次探测全部IP，-a只输出在线主机"""
+        timeout_ms = str(max(1, int(self.timeout * 1000)))
+        result = subprocess.run(
+            ['fping', '-a', '-q', '-r', '0', '-t', timeout_ms, '-i', '1', *ip_list],
+            capture_output=True,
+            text=True,
+            timeout=self.timeout + len(ip_list) * 0.001 + 2
+        )
+        return set(result.stdout.split())
+    
+    def _open_icmp_socket(self) -> socket.socket:
+        """创建ICMP socket：优先非特权的SOCK_DGRAM（Linux/macOS），失败时尝试需要管理员权限的原始socket"""
+        try:
+            return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        except OSError:
+            return socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+    
+    def _icmp_socket_sweep(self, ip_list: List[str]) -> set:
+        """通过ICMP socket向所有IP发送回显请求并收集应答"""
+        alive = set()
+        targets = set(ip_list)
+        ident = os.getpid() & 0xffff
+        
+        with self._open_icmp_socket() as sock:
+            sock.setblocking(False)
             
-            # 收集结果并显示进度
-            for future in as_completed(future_to_ip):
-                ip = future_to_ip[future]
+            for seq, ip in enumerate(ip_list):
+                header = struct.pack('!BBHHH', _ICMP_ECHO_REQUEST, 0, 0, ident, seq & 0xffff)
+                checksum = _icmp_checksum(header)
+                packet = struct.pack('!BBHHH', _ICMP_ECHO_REQUEST, 0, checksum, ident, seq & 0xffff)
                 try:
-                    result = future.result()
-                    if result:
-                        live_hosts.append(result)
-                        logger.debug(f"发现存活主机: {ip}")
-                except Exception as e:
-                    logger.debug(f"扫描 {ip} 失败: {e}")
+                    sock.sendto(packet, (ip, 0))
+                except OSError:
+                    # 发送失败（如网络不可达）视为不在线
+                    continue
+            
+            with selectors.DefaultSelector() as sel:
+                sel.register(sock, selectors.EVENT_READ)
+                deadline = time.monotonic() + self.timeout
                 
-                # 更新进度
-                completed += 1
-                if completed % 20 == 0:  # 每20个IP显示一次进度
-                    progress = (completed / total_ips) * 100
-                    logger.log_network_operation("扫描进度", f"{completed}/{total_ips} ({progress:.1f}%)")
+                while len(alive) < len(targets):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not sel.select(remaining):
+                        break
+                    
+                    # 一次读空所有已到达的应答
+                    while True:
+                        try:
+                            data, (addr, _) = sock.recvfrom(1024)
+                        except (BlockingIOError, InterruptedError):
+                            break
+                        
+                        # 部分平台（如macOS）返回的数据包含IP头
+                        if data and data[0] >> 4 == 4:
+                            data = data[(data[0] & 0x0f) * 4:]
+                        
+                        if data and data[0] == _ICMP_ECHO_REPLY and addr in targets:
+                            alive.add(addr)
         
-        logger.log_network_operation("扫描完成", f"发现 {len(live_hosts)} 个存活主机")
-        return live_hosts
+        return alive
     
-    def _check_host_ports(self, ip: str) -> Optional[Dict[str, Any]]:
-        """检查主机端口 - 优化性能"""
-        # 先跳过一些明显不可能的IP
-        if ip.endswith('.0') or ip.endswith('.255'):  # 网络地址和广播地址
-            return None
+    def _scan_ports_epoll(self, ip_list: Iterable[str]) -> List[Dict[str, Any]]:
+        """使用非阻塞socket + selectors(epoll/kqueue/select)并发探测所有端口"""
+        # 每个IP的Web端口和合成端口同时独立探测，结果写入该IP共享的同一条记录
+        results = {}
+        self._probe_targets(self._port_targets(ip_list), results)
         
-        result = {
-            'address': ip,
-            'web_port': None,
-            'synth_port': None
-        }
+        # 对外仍返回字典，后续验证流程会在其上记录状态
+        return [host._asdict() for host in results.values()]
+    
+    def _port_targets(self, ip_list: Iterable[str]) -> Iterator[Tuple[str, str, int]]:
+        """为每个IP生成Web端口和合成端口两个探测目标"""
+        web_port = self.index_tts_ports['web']
+        synth_port = self.index_tts_ports['synth']
+        for ip in ip_list:
+            yield ip, 'web_port', web_port
+            yield ip, 'synth_port', synth_port
+    
+    def _probe_targets(self, targets: Iterable[Tuple[str, str, int]], results: Dict[str, Host]):
+        """滚动窗口探测：保持最多max_sockets个连接在途，每完成或超时一个就补充下一个目标"""
+        sel = selectors.DefaultSelector()
+        pending = iter(targets)
+        seq_counter = itertools.count()
+        inflight = {}  # 序号 -> socket（用序号而非fd，避免fd被复用后误判超时）
+        deadlines = []  # 小顶堆：(截止时间, 序号)
+        completed = 0
+        last_step = 0
         
-        # 并行检查两个端口
-        import threading
+        def record_open(ip, key, port):
+            # 只为有端口开放的主机创建结果，关闭/超时的IP不产生任何分配
+            host = results.get(ip)
+            if host is None:
+                host = Host(ip, None, None)
+                if logger.debug_mode:
+                    logger.debug(f"发现存活主机: {ip}")
+            results[ip] = host._replace(**{key: port})
         
-        def check_web_port():
-            if self._is_port_open(ip, self.index_tts_ports['web']):
-                result['web_port'] = self.index_tts_ports['web']
+        def on_result(ip, key, port, err):
+            if err == 0:
+                record_open(ip, key, port)
         
-        def check_synth_port():
-            if self._is_port_open(ip, self.index_tts_ports['synth']):
-                result['synth_port'] = self.index_tts_ports['synth']
+        def finish(seq):
+            sock = inflight.pop(seq)
+            sel.unregister(sock)
+            sock.close()
         
-        # 创建线程并行检查
-        web_thread = threading.Thread(target=check_web_port)
-        synth_thread = threading.Thread(target=check_synth_port)
+        def fill():
+            # 补充新连接直到达到并发上限或目标耗尽
+            while len(inflight) < self.max_sockets:
+                target = next(pending, None)
+                if target is None:
+                    return
+                
+                ip, key, port = target
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM | _SOCK_NONBLOCK)
+                if not _SOCK_NONBLOCK:
+                    sock.setblocking(False)
+                try:
+                    _configure_probe_socket(sock)
+                    err = sock.connect_ex((ip, port))
+                except OSError as e:
+                    if logger.debug_mode:
+                        logger.debug(f"扫描 {ip}:{port} 失败: {e}")
+                    sock.close()
+                    continue
+                
+                if err in _CONNECT_IN_PROGRESS:
+                    seq = next(seq_counter)
+                    inflight[seq] = sock
+                    sel.register(sock, selectors.EVENT_WRITE, (seq, ip, key, port))
+                    heapq.heappush(deadlines, (time.monotonic() + self.timeout, seq))
+                    continue
+                
+                # 本机地址可能立即连接成功或被拒绝
+                on_result(ip, key, port, err)
+                sock.close()
         
-        web_thread.start()
-        synth_thread.start()
+        try:
+            fill()
+            while inflight:
+                # 丢弃已完成连接的过期堆项，最近的截止时间决定本轮等待时长
+                while deadlines[0][1] not in inflight:
+                    heapq.heappop(deadlines)
+                wait = max(0.0, deadlines[0][0] - time.monotonic())
+                
+                # 处理已完成的连接：可写时通过SO_ERROR判断连接是否成功
+                for key_obj, _ in sel.select(wait):
+                    seq, ip, key, port = key_obj.data
+                    on_result(ip, key, port, key_obj.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR))
+                    finish(seq)
+                    completed += 1
+                
+                # 关闭已超时的连接
+                now = time.monotonic()
+                while deadlines and deadlines[0][0] <= now:
+                    _, seq = heapq.heappop(deadlines)
+                    if seq in inflight:
+                        finish(seq)
+                        completed += 1
+                
+                # 每完成一个窗口的探测才记录一次进度
+                if logger.debug_mode and completed // self.max_sockets > last_step:
+                    last_step = completed // self.max_sockets
+                    logger.debug(f"扫描进度: 已完成 {completed} 个端口探测，发现 {len(results)} 个存活主机")
+                
+                fill()
+        finally:
+            sel.close()
+            for sock in inflight.values():
+                sock.close()
+    
+    def _check_host_ports(self, ip: str) -> Optional[Host]:
+        """检查主机端口 - Web端口和合成端口同时探测"""
+        results = {}
+        self._probe_targets(self._port_targets([ip]), results)
         
-        web_thread.join(timeout=self.timeout + 0.5)
-        synth_thread.join(timeout=self.timeout + 0.5)
+        # 至少有一个端口开放时才有结果
+        return results.get(ip)
+    
+    def _probe_port(self, ip: str, port: int) -> str:
+        """探测单个端口状态：开放、拒绝连接（主机在线）或超时/不可达
         
-        # 至少有一个端口开放
-        if result['web_port'] or result['synth_port']:
-            return result
+        仅用于单主机检查，批量扫描走_probe_targets的非阻塞selectors路径
+        """
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                _configure_probe_socket(sock)
+                
+                result = sock.connect_ex((self._resolve(ip), port))
+            
+        except OSError:
+            return PORT_TIMEOUT
         
-        return None
+        if result == 0:
+            return PORT_OPEN
+        if result in _CONNECT_REFUSED:
+            return PORT_REFUSED
+        return PORT_TIMEOUT
+    
+    def _resolve(self, host: str) -> str:
+        """将主机名解析为IPv4地址，结果按TTL缓存；IP地址直接返回"""
+        try:
+            socket.inet_aton(host)
+            return host
+        except OSError:
+            pass
+        
+        now = time.monotonic()
+        cached = self._dns_cache.get(host)
+        if cached and cached[1] > now:
+            return cached[0]
+        
+        try:
+            ip = socket.getaddrinfo(host, None, socket.AF_INET, socket.SOCK_STREAM)[0][4][0]
+        except (OSError, IndexError):
+            # 解析失败时原样返回，由后续连接报告错误
+            return host
+        
+        self._dns_cache[host] = (ip, now + _DNS_CACHE_TTL)
+        return ip
     
     def _is_port_open(self, ip: str, port: int) -> bool:
         """检查端口是否开放"""
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.timeout)
-            
-            result = sock.connect_ex((ip, port))
-            sock.close()
-            
-            return result == 0
-            
-        except Exception as e:
-            return False
+        return self._probe_port(ip, port) == PORT_OPEN
     
     def _verify_servers(self, live_hosts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """验证服务器"""
-        verified_servers = []
+        """验证服务器 - 并发验证所有存活主机，结果保持原有顺序"""
+        if not live_hosts:
+            return []
         
-        for host in live_hosts:
-            try:
-                if self._verify_index_tts_server(host):
-                    verified_servers.append(host)
-            except Exception as e:
-                safe_print(f"验证服务器 {host['address']} 失败: {e}")
+        # 验证受网络延迟限制，最多16个并发即可；_verify_index_tts_server自身捕获异常
+        with ThreadPoolExecutor(max_workers=min(len(live_hosts), 16)) as executor:
+            results = list(executor.map(self._verify_index_tts_server, live_hosts))
         
-        return verified_servers
+        verified = []
+        for host, ok in zip(live_hosts, results):
+            if ok:
+                # 验证通过即可用，选择对话框直接读取此状态，无需再次探测
+                host['verified'] = True
+                host['status'] = '可用'
+                verified.append(host)
+        return verified
     
     def _verify_index_tts_server(self, host: Dict[str, Any]) -> bool:
         """验证index-tts服务器"""
         try:
-            # 优先验证Web端口
+            # 优先验证Web端口，成功后不再验证合成端口
             if host.get('web_port'):
                 if self._verify_gradio_api(host['address'], host['web_port']):
                     return True
@@ -606,76 +952,129 @@ class NetworkScanner:
             return False
             
         except Exception as e:
-            safe_print(f"验证服务器失败: {e}")
+            if logger.debug_mode:
+                logger.debug(f"验证服务器失败: {e}")
             return False
     
     def _verify_gradio_api(self, ip: str, port: int) -> bool:
-        """验证Gradio API"""
+        """验证Gradio API - 直接请求/config确认是提供change_choices接口的index-tts服务"""
         try:
-            # 重定向标准输出以避免gradio_client的Unicode输出问题
-            import sys
-            import io
-            old_stdout = sys.stdout
-            sys.stdout = io.StringIO()
+            response = self._session.get(f"http://{ip}:{port}/config", timeout=self.timeout)
             
-            try:
-                # 尝试创建Gradio客户端
-                client = Client(f"http://{ip}:{port}/")
-                
-                # 尝试调用API
-                result = client.predict(api_name="/change_choices")
-                
-            finally:
-                # 恢复标准输出
-                sys.stdout = old_stdout
+            if response.status_code == 200:
+                config = response.json()
+                if isinstance(config, dict) and self._is_index_tts_config(config):
+                    logger.info(f"验证成功: {ip}:{port} - index-tts (Gradio {config.get('version', '')})")
+                    return True
+            
+        except Exception as e:
+            if logger.debug_mode:
+                logger.debug(f"Gradio API验证失败 {ip}:{port}: {e}")
+        
+        # 仅在用户明确开启时才回退到完整的gradio客户端验证
+        if self.use_gradio_client:
+            return self._verify_gradio_client(ip, port)
+        
+        return False
+    
+    def _is_index_tts_config(self, config: Dict[str, Any]) -> bool:
+        """判断/config返回的Gradio配置是否为index-tts：必须提供change_choices接口
+        
+        只有version字段的配置可能是任意Gradio应用（如SD WebUI），不能视为index-tts
+        """
+        dependencies = config.get('dependencies') or ()
+        return any(
+            isinstance(dep, dict) and (dep.get('api_name') or '').lstrip('/') == 'change_choices'
+            for dep in dependencies
+        )
+    
+    def _verify_gradio_client(self, ip: str, port: int) -> bool:
+        """使用gradio客户端调用/change_choices验证（较慢，需显式开启）"""
+        if Client is None:
+            return False
+        
+        url = f"http://{ip}:{port}/"
+        
+        # 先用廉价的HEAD请求确认对方是正常响应的HTTP服务，再创建开销较大的客户端
+        try:
+            if self._session.head(url, timeout=self.timeout).status_code >= 500:
+                return False
+        except Exception as e:
+            if logger.debug_mode:
+                logger.debug(f"Gradio服务预检失败 {ip}:{port}: {e}")
+            return False
+        
+        key = (ip, port)
+        try:
+            cached = self._gradio_cache.get(key)
+            if cached and cached[1] > time.monotonic():
+                client = cached[0]
+            else:
+                client = Client(url, verbose=False)
+                self._gradio_cache[key] = (client, time.monotonic() + _GRADIO_CLIENT_TTL)
+            
+            result = client.predict(api_name="/change_choices")
             
             # 检查结果
             if isinstance(result, list) and len(result) > 0:
-                safe_print(f"验证成功: {ip}:{port} - 找到 {len(result)} 个角色")
+                logger.info(f"验证成功: {ip}:{port} - 找到 {len(result)} 个角色")
                 return True
             
             return False
             
         except Exception as e:
-            safe_print(f"Gradio API验证失败 {ip}:{port}: {e}")
+            self._gradio_cache.pop(key, None)
+            if logger.debug_mode:
+                logger.debug(f"Gradio客户端验证失败 {ip}:{port}: {e}")
             return False
     
     def _verify_synth_api(self, ip: str, port: int) -> bool:
         """验证合成API"""
         try:
-            # 尝试HTTP请求
-            import requests
-            
+            # 用HEAD请求避免下载响应体（复用连接池，会话默认keep-alive）
             url = f"http://{ip}:{port}/"
-            response = requests.get(url, timeout=self.timeout)
+            response = self._session.head(url, timeout=self.timeout)
+            
+            # 部分框架未为GET路由注册HEAD，此时再回退到GET
+            if response.status_code == 405:
+                response = self._session.get(url, timeout=self.timeout)
             
             # 检查响应状态
             if response.status_code == 200:
-                safe_print(f"合成API验证成功: {ip}:{port}")
+                logger.info(f"合成API验证成功: {ip}:{port}")
                 return True
             
             return False
             
         except Exception as e:
-            safe_print(f"合成API验证失败 {ip}:{port}: {e}")
+            if logger.debug_mode:
+                logger.debug(f"合成API验证失败 {ip}:{port}: {e}")
             return False
     
     def scan_single_host(self, ip: str) -> Optional[Dict[str, Any]]:
         """扫描单个主机"""
         try:
-            result = self._check_host_ports(ip)
-            if result and self._verify_index_tts_server(result):
+            host = self._check_host_ports(ip)
+            if host is None:
+                return None
+            
+            result = host._asdict()
+            if self._verify_index_tts_server(result):
                 return result
             return None
         except Exception as e:
+            logger.error(f"扫描单个主机失败: {e}")
             safe_print(f"扫描单个主机失败: {e}")
             return None
     
     def get_network_info(self) -> Dict[str, Any]:
         """获取网络信息"""
+        if psutil is None:
+            logger.warning("psutil not available, limited network info")
+            safe_print("psutil not available, limited network info")
+            return {'error': 'psutil not available'}
+        
         try:
-            import psutil
-            
             # 获取所有网络接口
             interfaces = psutil.net_if_addrs()
             
@@ -700,15 +1099,17 @@ class NetworkScanner:
             
             return network_info
             
-        except ImportError:
-            safe_print("psutil not available, limited network info")
-            return {'error': 'psutil not available'}
         except Exception as e:
+            logger.error(f"获取网络信息失败: {e}")
             safe_print(f"获取网络信息失败: {e}")
             return {'error': str(e)}
     
-    def set_scan_config(self, timeout: float = None, max_threads: int = None, fast_mode: bool = None):
+    def set_scan_config(self, timeout: float = None, max_threads: int = None, fast_mode: bool = None,
+                        use_gradio_client: bool = None, icmp_sweep: bool = None):
         """设置扫描配置"""
+        # 配置变化后重新解析主机名
+        self._dns_cache.clear()
+        
         if timeout is not None:
             self.timeout = timeout
             logger.debug(f"设置超时时间为: {timeout} 秒")
@@ -720,6 +1121,14 @@ class NetworkScanner:
         if fast_mode is not None:
             self.fast_mode = fast_mode
             logger.debug(f"设置快速模式: {fast_mode}")
+        
+        if use_gradio_client is not None:
+            self.use_gradio_client = use_gradio_client
+            logger.debug(f"设置gradio客户端验证: {use_gradio_client}")
+        
+        if icmp_sweep is not None:
+            self.icmp_sweep = icmp_sweep
+            logger.debug(f"设置ICMP预扫描: {icmp_sweep}")
     
     def get_scan_config(self) -> Dict[str, Any]:
         """获取当前扫描配置"""
@@ -727,22 +1136,18 @@ class NetworkScanner:
             'timeout': self.timeout,
             'max_threads': self.max_threads,
             'fast_mode': getattr(self, 'fast_mode', True),
+            'use_gradio_client': self.use_gradio_client,
+            'icmp_sweep': self.icmp_sweep,
             'scan_ports': self.index_tts_ports
         }
     
     def estimate_scan_time(self, ip_count: int = None) -> Dict[str, float]:
         """估算扫描时间"""
         if ip_count is None:
-            ip_list = self._get_scan_ips()
-            ip_count = len(ip_list)
-        
-        # 基于当前配置估算时间
-        time_per_ip = self.timeout * 0.8  # 考虑并行优化
-        total_time = ip_count * time_per_ip
+            # 使用上次扫描生成的IP数量，尚未扫描过时按一个/24网段估算
+            ip_count = self._last_ip_count or 254
         
-        # 考虑线程池并发
-        concurrent_factor = min(self.max_threads, ip_count)
-        estimated_time = total_time / concurrent_factor
+        estimated_time = _estimate_scan_seconds(ip_count, self.timeout, self.max_threads)
         
         return {
             'estimated_seconds': estimated_time,
@@ -753,51 +1158,72 @@ class NetworkScanner:
         }
     
     def ping_host(self, ip: str) -> bool:
-        """ping主机"""
-        try:
-            import subprocess
-            
-            # Windows系统使用ping命令
-            result = subprocess.run(
-                ['ping', '-n', '1', '-w', str(self.timeout * 1000), ip],
-                capture_output=True,
-                text=True,
-                timeout=self.timeout + 2
-            )
-            
-            return result.returncode == 0
-            
-        except Exception as e:
-            safe_print(f"Ping失败: {e}")
-            return False
+        """ping主机 - 不启动任何子进程（fping只用于bulk_ping批量探测）"""
+        icmp_done = False
+        
+        # 优先使用icmplib发送ICMP回显（可选依赖）
+        if icmplib is not None:
+            try:
+                if icmplib.ping(ip, count=1, timeout=self.timeout, privileged=False).is_alive:
+                    return True
+                icmp_done = True
+            except Exception as e:
+                logger.debug(f"icmplib ping失败，改用ICMP socket: {e}")
+        
+        # icmplib不可用时使用非特权ICMP socket
+        if not icmp_done:
+            try:
+                if ip in self._icmp_socket_sweep([ip]):
+                    return True
+            except OSError as e:
+                logger.debug(f"无法创建ICMP socket，改用TCP探测: {e}")
+        
+        # 没有ICMP应答时仍以TCP确认（防火墙可能屏蔽ICMP）
+        return self._tcp_ping(ip)
     
-    def get_port_info(self, port: int) -> Dict[str, Any]:
-        """获取端口信息"""
-        port_info = {
-            7860: {
-                'name': 'Gradio Web Interface',
-                'description': 'index-tts Web界面端口',
-                'protocol': 'HTTP'
-            },
-            9880: {
-                'name': 'Synthesis Interface',
-                'description': 'index-tts合成接口端口',
-                'protocol': 'HTTP'
-            }
-        }
+    def bulk_ping(self, ips: Iterable[str]) -> set:
+        """批量检查主机是否在线，返回在线IP集合"""
+        ips = list(ips)
+        if not ips:
+            return set()
+        
+        alive = self._icmp_sweep(ips)
+        if alive is None:
+            alive = set()
         
-        return port_info.get(port, {
+        # 未响应ICMP的主机并发用TCP确认
+        rest = [ip for ip in ips if ip not in alive]
+        if rest:
+            with ThreadPoolExecutor(max_workers=min(len(rest), 16)) as executor:
+                alive.update(ip for ip, ok in zip(rest, executor.map(self._tcp_ping, rest)) if ok)
+        
+        return alive
+    
+    def _tcp_ping(self, ip: str, port: int = 80) -> bool:
+        """TCP存活检查：连接成功或被拒绝（RST）都说明主机在线"""
+        return self._probe_port(ip, port) != PORT_TIMEOUT
+    
+    def get_port_info(self, port: int) -> Mapping[str, Any]:
+        """获取端口信息"""
+        return _PORT_INFO.get(port) or {
             'name': f'Port {port}',
             'description': 'Unknown port',
             'protocol': 'Unknown'
-        })
+        }
     
     def validate_ip_address(self, ip: str) -> bool:
         """验证IP地址格式"""
+        # 直接调用系统inet_pton解析，无需构造ipaddress对象
         try:
-            ipaddress.ip_address(ip)
+            socket.inet_pton(socket.AF_INET, ip)
             return True
-        except ValueError:
+        except (OSError, ValueError, TypeError):
+            pass
+        
+        try:
+            socket.inet_pton(socket.AF_INET6, ip)
+            return True
+        except (OSError, ValueError, TypeError):
             return False
     
     def validate_port_range(self, port_range: str) -> bool:
@@ -817,59 +1243,3 @@ class NetworkScanner:
                 
         except ValueError:
             return False
-    
-        
-    def _on_list_key_down(self, event, dialog, servers, list_ctrl):
-        """处理服务器列表的键盘事件"""
-        try:
-            import wx
-            
-            # 获取按键代码
-            key_code = event.GetKeyCode()
-            
-            # 如果按下回车键
-            if key_code == wx.WXK_RETURN:
-                # 获取光标所在的行
-                focused_item = list_ctrl.GetFocusedItem()
-                
-                if focused_item != -1:
-                    # 光标在某一行上，直接返回该行的服务器
-                    chosen_server = servers[focused_item]
-                    dialog.EndModal(wx.ID_OK)
-                    return
-            
-            # 如果按下ESC键
-            elif key_code == wx.WXK_ESCAPE:
-                # 直接关闭对话框
-                dialog.EndModal(wx.ID_CANCEL)
-                return
-            
-            # 处理上下键移动光标
-            elif key_code == wx.WXK_UP:
-                # 向上移动光标并自动获得焦点
-                focused_item = list_ctrl.GetFocusedItem()
-                if focused_item > 0:
-                    # 清除原来的焦点和选中状态
-                    list_ctrl.SetItemState(focused_item, 0, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED)
-                    # 设置新的焦点和选中状态
-                    list_ctrl.SetItemState(focused_item - 1, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED)
-                    list_ctrl.EnsureVisible(focused_item - 1)
-                return
-            
-            elif key_code == wx.WXK_DOWN:
-                # 向下移动光标并自动获得焦点
-                focused_item = list_ctrl.GetFocusedItem()
-                if focused_item < list_ctrl.GetItemCount() - 1:
-                    # 清除原来的焦点和选中状态
-                    list_ctrl.SetItemState(focused_item, 0, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED)
-                    # 设置新的焦点和选中状态
-                    list_ctrl.SetItemState(focused_item + 1, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED)
-                    list_ctrl.EnsureVisible(focused_item + 1)
-                return
-            
-            # 其他按键交给默认处理
-            event.Skip()
-            
-        except Exception as e:
-            safe_print(f"处理键盘事件失败: {e}")
-            event.Skip()
\ No newline at end of file
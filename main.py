@@ -8,22 +8,21 @@ LegadoTTSTool - 语音合成角色导出工具
 import wx
 import os
 import sys
-import json
-import time
 import threading
+from concurrent.futures import Future
 from pathlib import Path
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from ui.main_frame import MainFrame
-from core.provider_manager import ProviderManager
-from utils.file_utils import FileUtils
-from utils.accessibility import AccessibilityUtils
+from utils.logger import get_logger
 
 class LegadoTTSApp(wx.App):
     """LegadoTTS应用程序主类"""
     
+    # 启动时需要存在的目录
+    _DIRS = ("config", "exports", "logs", "temp")
+    
     def OnInit(self):
         """初始化应用程序"""
         try:
@@ -33,25 +32,32 @@ class LegadoTTSApp(wx.App):
             # 创建必要的目录
             self._create_directories()
             
-            # 初始化提供商会管理器
-            self.provider_manager = ProviderManager()
+            # 在后台线程初始化提供商管理器，不阻塞主窗口显示
+            self._pm_future = Future()
+            threading.Thread(target=self._init_provider_manager, daemon=True).start()
+            
+            # 延迟导入：主窗口及其依赖（requests、gradio_client等）在wx.App启动后才加载
+            from ui.main_frame import MainFrame
+            
+            logger = get_logger()
             
             # 创建主窗口
-            print("正在创建主窗口...")
+            logger.debug("正在创建主窗口...")
             self.frame = MainFrame(None, title="LegadoTTSTool - 语音合成角色导出工具")
             self.frame.Centre()
             self.frame.Show()
-            print("主窗口创建成功")
+            logger.debug("主窗口创建成功")
             
             # 设置无障碍支持
-            print("正在设置无障碍支持...")
+            logger.debug("正在设置无障碍支持...")
             self._setup_accessibility()
-            print("无障碍支持设置完成")
+            logger.debug("无障碍支持设置完成")
             
             return True
             
         except Exception as e:
             import traceback
+            get_logger().error(f"程序初始化失败: {str(e)}")
             print(f"程序初始化失败: {str(e)}")
             print("详细错误信息:")
             traceback.print_exc()
@@ -61,7 +67,7 @@ class LegadoTTSApp(wx.App):
     def OnExit(self):
         """应用程序退出时的清理工作"""
         try:
-            print("应用程序正在退出...")
+            get_logger().debug("应用程序正在退出...")
             
             # 先清理框架
             if hasattr(self, 'frame') and self.frame:
@@ -72,34 +78,49 @@ class LegadoTTSApp(wx.App):
                     pass
             
             # 然后清理管理器
-            if hasattr(self, 'provider_manager'):
-                self.provider_manager = None
+            self._pm_future = None
             
         except Exception as e:
+            get_logger().error(f"退出清理失败: {e}")
             print(f"退出清理失败: {e}")
         
         # 调用父类的退出方法
         return 0
     
+    @property
+    def provider_manager(self):
+        """提供商管理器，后台初始化尚未完成时等待其完成"""
+        future = getattr(self, '_pm_future', None)
+        return future.result() if future else None
+    
+    def _init_provider_manager(self):
+        """后台线程：创建提供商管理器"""
+        try:
+            from core.provider_manager import ProviderManager
+            self._pm_future.set_result(ProviderManager())
+        except Exception as e:
+            self._pm_future.set_exception(e)
+    
     def _create_directories(self):
         """创建必要的目录结构"""
-        directories = [
-            "config",
-            "exports",
-            "logs",
-            "temp"
-        ]
+        # 一次scandir获取已存在的目录，只为缺失的目录调用mkdir
+        with os.scandir('.') as entries:
+            existing = {entry.name for entry in entries if entry.is_dir()}
         
-        for directory in directories:
-            Path(directory).mkdir(parents=True, exist_ok=True)
+        for directory in self._DIRS:
+            if directory not in existing:
+                Path(directory).mkdir(exist_ok=True)
     
     def _setup_accessibility(self):
         """设置无障碍支持"""
         try:
+            from utils.accessibility import AccessibilityUtils
+            
             # 启用屏幕阅读器支持
             accessibility = AccessibilityUtils()
             accessibility.setup_global_accessibility()
         except Exception as e:
+            get_logger().error(f"无障碍设置失败: {e}")
             print(f"无障碍设置失败: {e}")
 
 def main():
@@ -113,8 +134,10 @@ def main():
         app.MainLoop()
         
     except KeyboardInterrupt:
+        get_logger().info("程序被用户中断")
         print("程序被用户中断")
     except Exception as e:
+        get_logger().error(f"程序运行错误: {e}")
         print(f"程序运行错误: {e}")
         try:
             wx.MessageBox(f"程序运行错误: {str(e)}", "错误", wx.OK | wx.ICON_ERROR)
@@ -128,22 +151,19 @@ def main():
                 if app.IsMainLoopRunning():
                     app.ExitMainLoop()
                 
-                # 延迟一下再销毁应用
-                import time
-                time.sleep(0.1)
+                # 处理完剩余事件再销毁应用
+                while app.Pending():
+                    app.Dispatch()
+                app.ProcessIdle()
                 
                 # 销毁应用
                 app.Destroy()
             except RecursionError:
+                get_logger().warning("检测到递归错误，跳过应用销毁")
                 print("检测到递归错误，跳过应用销毁")
             except Exception as e:
+                get_logger().error(f"应用销毁失败: {e}")
                 print(f"应用销毁失败: {e}")
-            finally:
-                # 强制退出所有wxPython窗口
-                try:
-                    wx.GetApp().Exit()
-                except:
-                    pass
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -18,30 +18,40 @@ def main():
         current_dir = os.path.dirname(os.path.abspath(__file__))
         sys.path.insert(0, current_dir)
         
-        # 检查依赖
-        try:
-            import wx
-            print(f"wxPython 版本: {wx.__version__}")
-        except ImportError:
-            print("错误: 未找到 wxPython，请运行: pip install wxPython")
-            return
+        # --verbose 开启调试日志
+        if '--verbose' in sys.argv:
+            from utils.logger import get_logger
+            get_logger().set_debug_mode(True)
         
-        try:
-            import requests
-            print(f"requests 版本: {requests.__version__}")
-        except ImportError:
-            print("错误: 未找到 requests，请运行: pip install requests")
-            return
+        # 检查依赖（仅在调试或 --check 时探测版本，正常启动由 main 自行导入）
+        if os.environ.get('LEGADO_TTS_DEBUG') or '--check' in sys.argv:
+            try:
+                import wx
+                print(f"wxPython 版本: {wx.__version__}")
+            except ImportError:
+                print("错误: 未找到 wxPython，请运行: pip install wxPython")
+                return
         
-        try:
-            import gradio_client
-            print(f"gradio_client 版本: {gradio_client.__version__}")
-        except ImportError:
-            print("错误: 未找到 gradio_client，请运行: pip install gradio_client")
-            return
+            try:
+                import requests
+                print(f"requests 版本: {requests.__version__}")
+            except ImportError:
+                print("错误: 未找到 requests，请运行: pip install requests")
+                return
+        
+            try:
+                import gradio_client
+                print(f"gradio_client 版本: {gradio_client.__version__}")
+            except ImportError:
+                print("错误: 未找到 gradio_client，请运行: pip install gradio_client")
+                return
         
         # 导入主程序
-        from main import main as app_main
+        try:
+            from main import main as app_main
+        except ImportError as e:
+            print(f"错误: 缺少依赖 {e.name}，请运行: pip install -r requirements.txt")
+            return
         
         # 运行主程序
         print("程序启动成功！")
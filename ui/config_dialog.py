@@ -5,19 +5,47 @@
 用于创建和编辑TTS方案配置
 """
 
+import re
+import threading
+import uuid
 import wx
 import wx.lib.scrolledpanel
-import uuid
-import time
+from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 
 from core.network_scanner import NetworkScanner
 from ui.events import SoundStopEvent, EVT_SOUND_STOP
 from utils.sound_manager import SoundManager
+from utils.server_list_ctrl import ServerListCtrl
+from utils.accessibility import AccessibilityUtils
+
+# 端口格式：1-5位数字且不以0开头，范围上限另行比较
+_PORT_RE = re.compile(r'^[1-9][0-9]{0,4}$')
+
+# index-tts 默认端口
+_DEFAULT_PORTS = {'web_port': 7860, 'synth_port': 9880}
 
 class ConfigDialog(wx.Dialog):
     """方案配置对话框"""
     
+    # 支持的方案类型
+    PROVIDER_TYPES = ("index-tts",)
+    
+    # 服务器字段表：(数据键, 控件属性名, 缺省值, 值为空时显示的文本)
+    _SERVER_FIELDS = (
+        ('address', 'server_address_text', '', ''),
+        ('web_port', 'web_port_text', 7860, ''),
+        ('synth_port', 'synth_port_text', 9880, ''),
+    )
+    
+    # 提供商配置字段表
+    _PROVIDER_FIELDS = (
+        ('server_address', 'server_address_text', '', ''),
+        ('web_port', 'web_port_text', 7860, ''),
+        ('synth_port', 'synth_port_text', 9880, ''),
+        ('timeout', 'timeout_text', 30, '30'),
+    )
+    
     def __init__(self, parent, title="配置方案", provider=None, server_data=None):
         """初始化配置对话框"""
         super().__init__(
@@ -34,8 +62,21 @@ class ConfigDialog(wx.Dialog):
         # 配置数据
         self.config_data = {}
         
-        # 支持的方案类型
-        self.provider_types = ["index-tts"]
+        # 已创建的动态配置面板（按类型缓存，延迟到首次显示或加载配置时创建）
+        self._panels = {}
+        
+        # 上一次显示的方案类型，类型未变化时不重复加载配置
+        self._last_type = None
+        
+        # 复用父窗口的网络扫描器，没有时在首次搜索时创建
+        self.network_scanner = getattr(parent, 'network_scanner', None)
+        
+        # 无障碍工具（首次播报搜索结果时创建）
+        self._accessibility = None
+        
+        # 进行中的网络搜索线程及其停止标志
+        self._scan_thread = None
+        self._scan_stop = threading.Event()
         
         # 初始化音效管理器
         self.sound_manager = SoundManager()
@@ -43,21 +84,31 @@ class ConfigDialog(wx.Dialog):
         # 绑定音效停止事件
         self.Bind(EVT_SOUND_STOP, self.on_sound_stop)
         
-        # 初始化界面
-        self._init_ui()
+        # 首次显示时再创建动态配置面板
+        self.Bind(wx.EVT_SHOW, self._on_first_show)
         
-        # 如果有方案数据，加载配置
-        if provider:
-            self._load_provider_config()
-        elif server_data:
-            self._load_server_config()
-        else:
-            # 设置默认值
-            self.type_combo.SetValue("index-tts")
-            self.on_type_changed(None)
+        # 对话框销毁时通知后台搜索停止
+        self.Bind(wx.EVT_WINDOW_DESTROY, self._on_destroy)
         
-        # 居中显示
-        self.Centre()
+        # 构建界面期间冻结对话框，避免逐个控件重绘
+        self.Freeze()
+        try:
+            # 初始化界面
+            self._init_ui()
+            
+            # 如果有方案数据，加载配置
+            if provider:
+                self._load_provider_config()
+            elif server_data:
+                self._load_server_config()
+            else:
+                # 设置默认值，动态配置面板在首次显示时创建
+                self.type_combo.SetValue("index-tts")
+            
+            # 居中显示
+            self.Centre()
+        finally:
+            self.Thaw()
     
     def _init_ui(self):
         """初始化用户界面"""
@@ -96,7 +147,7 @@ class ConfigDialog(wx.Dialog):
         type_label = wx.StaticText(parent, label="方案类型:")
         self.type_combo = wx.ComboBox(
             parent, 
-            choices=self.provider_types,
+            choices=self.PROVIDER_TYPES,
             style=wx.CB_READONLY
         )
         self.type_combo.Bind(wx.EVT_COMBOBOX, self.on_type_changed)
@@ -127,11 +178,20 @@ class ConfigDialog(wx.Dialog):
         
         sizer.Add(self.config_panel, 1, wx.EXPAND)
         
-        # 初始化默认配置
-        self.on_type_changed(None)
-        
         return sizer
     
+    def _on_first_show(self, event):
+        """首次显示时创建动态配置面板"""
+        if event.IsShown():
+            self.Unbind(wx.EVT_SHOW, handler=self._on_first_show)
+            self._ensure_dynamic_config()
+        event.Skip()
+    
+    def _ensure_dynamic_config(self):
+        """确保动态配置面板已创建"""
+        if not self._panels:
+            self.on_type_changed(None)
+    
     def _create_buttons(self, parent):
         """创建按钮区域"""
         sizer = wx.BoxSizer(wx.HORIZONTAL)
@@ -155,44 +215,33 @@ class ConfigDialog(wx.Dialog):
         try:
             # 设置提供商类型
             provider_type = self.provider.get('type', 'index-tts')
-            if provider_type in self.provider_types:
+            if provider_type in self.PROVIDER_TYPES:
                 self.type_combo.SetValue(provider_type)
             
             # 设置自定义名称
             custom_name = self.provider.get('custom_name', '')
             self.name_text.SetValue(custom_name)
             
-            # 加载动态配置
-            self._load_dynamic_config()
+            # 加载动态配置（首次创建面板时on_type_changed会一并加载）
+            if self._panels:
+                self._load_dynamic_config()
+            else:
+                self._ensure_dynamic_config()
             
         except Exception as e:
             wx.MessageBox(f"加载配置失败: {str(e)}", "错误", wx.OK | wx.ICON_ERROR)
     
     def _load_server_config(self):
         """加载服务器配置"""
-        try:
-            # 设置提供商类型
-            self.type_combo.SetValue('index-tts')
-            
-            # 设置服务器地址
-            if hasattr(self, 'server_address_text'):
-                self.server_address_text.SetValue(self.server_data.get('address', ''))
-            
-            # 设置端口
-            if hasattr(self, 'web_port_text'):
-                self.web_port_text.SetValue(str(self.server_data.get('web_port', 7860)))
-            
-            if hasattr(self, 'synth_port_text'):
-                self.synth_port_text.SetValue(str(self.server_data.get('synth_port', 9880)))
-            
-        except Exception as e:
-            print(f"加载服务器配置失败: {e}")
+        # 设置提供商类型
+        self.type_combo.SetValue('index-tts')
+        self._ensure_dynamic_config()
+        
+        # 设置服务器地址和端口
+        self._fill_fields(self.server_data, self._SERVER_FIELDS)
     
     def on_type_changed(self, event):
         """提供商类型改变事件"""
-        # 清空动态配置
-        self.config_sizer.Clear(True)
-        
         # 获取选择的类型
         provider_type = self.type_combo.GetValue()
         
@@ -201,24 +250,38 @@ class ConfigDialog(wx.Dialog):
             provider_type = "index-tts"
             self.type_combo.SetValue(provider_type)
         
-        # 根据类型创建配置界面
-        if provider_type == "index-tts":
-            self._create_index_tts_config()
-        else:
-            self._create_generic_config()
-        
-        # 重新布局
-        self.config_panel.Layout()
+        # 冻结面板，创建和切换完成后只重绘一次
+        self.config_panel.Freeze()
+        try:
+            # 根据类型创建配置界面，已创建过的直接复用
+            panel_key = provider_type if provider_type == "index-tts" else "generic"
+            if panel_key not in self._panels:
+                if panel_key == "index-tts":
+                    self._panels[panel_key] = self._create_index_tts_config()
+                else:
+                    self._panels[panel_key] = self._create_generic_config()
+            
+            # 只显示当前类型的面板
+            for key, panel in self._panels.items():
+                panel.Show(key == panel_key)
+            
+            # 重新布局
+            self.config_panel.Layout()
+        finally:
+            self.config_panel.Thaw()
         self.config_panel.Refresh()
         
-        # 如果是编辑模式，重新加载配置
-        if self.provider:
+        # 如果是编辑模式且类型发生变化，重新加载配置
+        if self.provider and self._last_type != provider_type:
             self._load_dynamic_config()
+        self._last_type = provider_type
     
     def _create_index_tts_config(self):
         """创建index-tts配置界面"""
+        panel = wx.Panel(self.config_panel)
+        
         # 创建静态框
-        static_box = wx.StaticBox(self.config_panel, label="index-tts 配置")
+        static_box = wx.StaticBox(panel, label="index-tts 配置")
         sizer = wx.StaticBoxSizer(static_box, wx.VERTICAL)
         
         # 创建网格布局
@@ -226,49 +289,48 @@ class ConfigDialog(wx.Dialog):
         grid_sizer.AddGrowableCol(1, 1)
         
         # 服务器地址
-        server_label = wx.StaticText(self.config_panel, label="服务器地址:")
-        self.server_address_text = wx.TextCtrl(self.config_panel)
-        grid_sizer.Add(server_label, 0, wx.ALIGN_CENTER_VERTICAL)
-        grid_sizer.Add(self.server_address_text, 0, wx.EXPAND)
+        self.server_address_text = wx.TextCtrl(panel)
+        self._add_row(panel, grid_sizer, "服务器地址:", self.server_address_text)
         
         # Web接口端口（非必填）
-        web_port_label = wx.StaticText(self.config_panel, label="Web接口端口:")
-        self.web_port_text = wx.TextCtrl(self.config_panel, value="7860")
-        grid_sizer.Add(web_port_label, 0, wx.ALIGN_CENTER_VERTICAL)
-        grid_sizer.Add(self.web_port_text, 0, wx.EXPAND)
+        self.web_port_text = wx.TextCtrl(panel, value="7860")
+        self._add_row(panel, grid_sizer, "Web接口端口:", self.web_port_text)
         
         # 合成接口端口（非必填）
-        synth_port_label = wx.StaticText(self.config_panel, label="合成接口端口:")
-        self.synth_port_text = wx.TextCtrl(self.config_panel, value="9880")
-        grid_sizer.Add(synth_port_label, 0, wx.ALIGN_CENTER_VERTICAL)
-        grid_sizer.Add(self.synth_port_text, 0, wx.EXPAND)
+        self.synth_port_text = wx.TextCtrl(panel, value="9880")
+        self._add_row(panel, grid_sizer, "合成接口端口:", self.synth_port_text)
         
         # 连接超时时间
-        timeout_label = wx.StaticText(self.config_panel, label="连接超时时间(秒):")
-        self.timeout_text = wx.TextCtrl(self.config_panel, value="30")
-        timeout_help = wx.StaticText(self.config_panel, label="0表示无超时")
-        grid_sizer.Add(timeout_label, 0, wx.ALIGN_CENTER_VERTICAL)
+        self.timeout_text = wx.TextCtrl(panel, value="30")
+        timeout_help = wx.StaticText(panel, label="0表示无超时")
         
         timeout_sizer = wx.BoxSizer(wx.HORIZONTAL)
         timeout_sizer.Add(self.timeout_text, 1, wx.EXPAND)
         timeout_sizer.Add(timeout_help, 0, wx.LEFT | wx.ALIGN_CENTER_VERTICAL, 5)
-        grid_sizer.Add(timeout_sizer, 0, wx.EXPAND)
+        self._add_row(panel, grid_sizer, "连接超时时间(秒):", timeout_sizer)
         
-        # 搜索按钮
-        scan_button = wx.Button(self.config_panel, label="搜索局域网")
+        # 搜索结果提示和搜索按钮
+        self.scan_status_label = wx.StaticText(panel, label="")
+        scan_button = wx.Button(panel, label="搜索局域网")
         scan_button.Bind(wx.EVT_BUTTON, self.on_scan_network)
-        grid_sizer.AddStretchSpacer()
+        grid_sizer.Add(self.scan_status_label, 0, wx.ALIGN_CENTER_VERTICAL)
         grid_sizer.Add(scan_button, 0, wx.ALIGN_RIGHT)
         
         sizer.Add(grid_sizer, 0, wx.EXPAND | wx.ALL, 10)
         
+        panel.SetSizer(sizer)
+        
         # 添加到主sizer
-        self.config_sizer.Add(sizer, 0, wx.EXPAND)
+        self.config_sizer.Add(panel, 0, wx.EXPAND)
+        
+        return panel
     
     def _create_generic_config(self):
         """创建通用配置界面"""
+        panel = wx.Panel(self.config_panel)
+        
         # 创建静态框
-        static_box = wx.StaticBox(self.config_panel, label="通用配置")
+        static_box = wx.StaticBox(panel, label="通用配置")
         sizer = wx.StaticBoxSizer(static_box, wx.VERTICAL)
         
         # 创建网格布局
@@ -276,52 +338,46 @@ class ConfigDialog(wx.Dialog):
         grid_sizer.AddGrowableCol(1, 1)
         
         # API地址
-        api_label = wx.StaticText(self.config_panel, label="API地址:")
-        self.api_url_text = wx.TextCtrl(self.config_panel)
-        grid_sizer.Add(api_label, 0, wx.ALIGN_CENTER_VERTICAL)
-        grid_sizer.Add(self.api_url_text, 0, wx.EXPAND)
+        self.api_url_text = wx.TextCtrl(panel)
+        self._add_row(panel, grid_sizer, "API地址:", self.api_url_text)
         
         # API密钥
-        api_key_label = wx.StaticText(self.config_panel, label="API密钥:")
-        self.api_key_text = wx.TextCtrl(self.config_panel)
-        grid_sizer.Add(api_key_label, 0, wx.ALIGN_CENTER_VERTICAL)
-        grid_sizer.Add(self.api_key_text, 0, wx.EXPAND)
+        self.api_key_text = wx.TextCtrl(panel)
+        self._add_row(panel, grid_sizer, "API密钥:", self.api_key_text)
         
         sizer.Add(grid_sizer, 0, wx.EXPAND | wx.ALL, 10)
         
+        panel.SetSizer(sizer)
+        
         # 添加到主sizer
-        self.config_sizer.Add(sizer, 0, wx.EXPAND)
+        self.config_sizer.Add(panel, 0, wx.EXPAND)
+        
+        return panel
     
         
+    def _add_row(self, parent, grid, label_text, ctrl):
+        """向两列网格添加一行：左侧标签，右侧控件"""
+        label = wx.StaticText(parent, label=label_text)
+        grid.Add(label, 0, wx.ALIGN_CENTER_VERTICAL)
+        grid.Add(ctrl, 0, wx.EXPAND)
+    
     def _load_dynamic_config(self):
         """加载动态配置"""
         provider_type = self.type_combo.GetValue()
         
         if provider_type == "index-tts":
             # 加载index-tts配置
-            if hasattr(self, 'server_address_text'):
-                self.server_address_text.SetValue(self.provider.get('server_address', ''))
-            
-            if hasattr(self, 'web_port_text'):
-                web_port = self.provider.get('web_port', 7860)
-                self.web_port_text.SetValue(str(web_port) if web_port else '')
-            
-            if hasattr(self, 'synth_port_text'):
-                synth_port = self.provider.get('synth_port', 9880)
-                self.synth_port_text.SetValue(str(synth_port) if synth_port else '')
-            
-            if hasattr(self, 'timeout_text'):
-                timeout = self.provider.get('timeout', 30)
-                self.timeout_text.SetValue(str(timeout) if timeout else '30')
+            self._fill_fields(self.provider, self._PROVIDER_FIELDS)
+    
+    def _fill_fields(self, data, fields):
+        """按字段表把数据填入对应的输入框（调用方保证index-tts面板已创建）"""
+        for key, attr, default, blank in fields:
+            value = data.get(key, default)
+            getattr(self, attr).SetValue(str(value) if value else blank)
     
     def on_scan_network(self, event):
         """搜索局域网事件"""
         try:
-            import wx.lib.newevent
-            
-            # 创建自定义事件
-            ScanCompleteEvent, EVT_SCAN_COMPLETE = wx.lib.newevent.NewEvent()
-            
             # 禁用搜索按钮
             button = event.GetEventObject()
             button.Enable(False)
@@ -330,25 +386,46 @@ class ConfigDialog(wx.Dialog):
             # 开始播放搜索音效
             self.sound_manager.start_sound_effect("search")
             
-            # 在后台线程中搜索
-            import threading
-            threading.Thread(
+            # 通知上一次搜索不再回调界面
+            self._scan_stop.set()
+            
+            if self.network_scanner is None:
+                self.network_scanner = NetworkScanner()
+            
+            # 在后台守护线程中搜索，退出程序时不等待扫描结束
+            self._scan_stop = threading.Event()
+            self._scan_thread = threading.Thread(
                 target=self._scan_network_thread,
-                args=(button,),
+                args=(button, self._scan_stop),
                 daemon=True
-            ).start()
+            )
+            self._scan_thread.start()
             
         except Exception as e:
             wx.MessageBox(f"搜索失败: {str(e)}", "错误", wx.OK | wx.ICON_ERROR)
     
-    def _scan_network_thread(self, button):
-        """在后台线程中搜索局域网"""
+    def _scan_network_thread(self, button, stop_evt):
+        """在后台线程中搜索局域网，stop_evt被设置后不再回调界面"""
         try:
-            # 使用真正的网络扫描器
-            scanner = NetworkScanner()
+            if stop_evt.is_set():
+                return
             
             # 仅扫描服务器，不涉及UI操作
-            scan_result = scanner.scan_and_select_server()
+            scan_result = self.network_scanner.scan_and_select_server()
+            
+            # 多个服务器时在后台预先生成列表行，选择列表直接读取
+            if isinstance(scan_result, list):
+                for server in scan_result:
+                    server['_row'] = (
+                        server['address'],
+                        str(server.get('web_port', 'N/A')),
+                        str(server.get('synth_port', 'N/A')),
+                        server.get('status', '未知')
+                    )
+            
+            # 对话框已关闭，结果直接丢弃
+            if stop_evt.is_set():
+                return
             
             # 停止搜索音效
             wx.PostEvent(self, SoundStopEvent(action_type="search"))
@@ -357,6 +434,9 @@ class ConfigDialog(wx.Dialog):
             wx.CallAfter(self._handle_scan_result, scan_result, button)
             
         except Exception as e:
+            if stop_evt.is_set():
+                return
+            
             # 停止搜索音效
             wx.PostEvent(self, SoundStopEvent(action_type="search"))
             wx.CallAfter(wx.MessageBox, f"搜索失败: {str(e)}", "错误", wx.OK | wx.ICON_ERROR)
@@ -370,21 +450,13 @@ class ConfigDialog(wx.Dialog):
                 
             elif isinstance(scan_result, dict):
                 # 只有一个服务器，直接使用
-                server_data = {
-                    'address': scan_result['address'],
-                    'web_port': scan_result.get('web_port', 7860),
-                    'synth_port': scan_result.get('synth_port', 9880)
-                }
+                server_data = self._server_data(scan_result)
                 
             elif isinstance(scan_result, list):
                 # 多个服务器，让用户选择
                 selected_server = self._let_user_choose_server(scan_result)
                 if selected_server:
-                    server_data = {
-                        'address': selected_server['address'],
-                        'web_port': selected_server.get('web_port', 7860),
-                        'synth_port': selected_server.get('synth_port', 9880)
-                    }
+                    server_data = self._server_data(selected_server)
                 else:
                     # 用户取消了选择，不自动填写地址
                     self._restore_scan_button(button)
@@ -400,6 +472,13 @@ class ConfigDialog(wx.Dialog):
             wx.MessageBox(f"处理搜索结果失败: {str(e)}", "错误", wx.OK | wx.ICON_ERROR)
             self._restore_scan_button(button)
     
+    def _server_data(self, server):
+        """从扫描结果提取服务器地址和端口，缺失的端口使用默认值"""
+        return {
+            'address': server['address'],
+            **{key: server.get(key, default) for key, default in _DEFAULT_PORTS.items()}
+        }
+    
     def _let_user_choose_server(self, servers: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """让用户选择服务器（在主线程中调用）"""
         try:
@@ -413,32 +492,19 @@ class ConfigDialog(wx.Dialog):
             prompt = wx.StaticText(dialog, label="找到多个TTS服务器，请选择一个：")
             main_sizer.Add(prompt, 0, wx.ALL, 10)
             
-            # 添加服务器列表
-            list_ctrl = wx.ListCtrl(dialog, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
-            list_ctrl.InsertColumn(0, "地址", width=120)
-            list_ctrl.InsertColumn(1, "Web端口", width=80)
-            list_ctrl.InsertColumn(2, "合成端口", width=80)
-            list_ctrl.InsertColumn(3, "状态", width=80)
-            
-            # 添加服务器到列表
-            scanner = NetworkScanner()
-            for i, server in enumerate(servers):
-                address = server['address']
-                web_port = str(server.get('web_port', 'N/A'))
-                synth_port = str(server.get('synth_port', 'N/A'))
-                
-                # 检查服务器状态
-                status = "可用" if scanner._check_server_status(server) else "不可用"
-                
-                index = list_ctrl.InsertItem(i, address)
-                list_ctrl.SetItem(index, 1, web_port)
-                list_ctrl.SetItem(index, 2, synth_port)
-                list_ctrl.SetItem(index, 3, status)
+            # 添加服务器列表（虚拟列表，行文本已在扫描线程中生成）
+            list_ctrl = ServerListCtrl(dialog, columns=(
+                ("地址", 120),
+                ("Web端口", 80),
+                ("合成端口", 80),
+                ("状态", 80)
+            ))
+            list_ctrl.set_rows([server['_row'] for server in servers])
             
             main_sizer.Add(list_ctrl, 1, wx.EXPAND | wx.LEFT | wx.RIGHT, 10)
             
-            # 绑定键盘事件，支持回车键确定
-            list_ctrl.Bind(wx.EVT_KEY_DOWN, lambda event: self._on_list_key_down(event, dialog, servers, list_ctrl))
+            # 绑定键盘事件，支持回车键确定（对话框即列表的父窗口）
+            list_ctrl.Bind(wx.EVT_KEY_DOWN, self._on_list_key_down)
             
             # 添加按钮 - 使用dialog作为父窗口
             button_sizer = wx.BoxSizer(wx.HORIZONTAL)
@@ -482,20 +548,30 @@ class ConfigDialog(wx.Dialog):
         """更新服务器配置"""
         try:
             # 更新配置
-            if hasattr(self, 'server_address_text'):
-                self.server_address_text.SetValue(server_data['address'])
-            
-            if hasattr(self, 'web_port_text'):
-                self.web_port_text.SetValue(str(server_data['web_port']))
+            self.Freeze()
+            try:
+                self._fill_fields(server_data, self._SERVER_FIELDS)
+            finally:
+                self.Thaw()
             
-            if hasattr(self, 'synth_port_text'):
-                self.synth_port_text.SetValue(str(server_data['synth_port']))
+            # 在按钮旁提示结果，不弹出模态对话框
+            self._show_scan_status(f"已找到服务器 {server_data['address']}")
             
         except Exception as e:
             wx.MessageBox(f"更新配置失败: {str(e)}", "错误", wx.OK | wx.ICON_ERROR)
         finally:
             self._restore_scan_button(button)
     
+    def _show_scan_status(self, message):
+        """在搜索按钮旁显示提示并通过屏幕阅读器播报"""
+        self.scan_status_label.SetForegroundColour(wx.Colour(0, 128, 0))
+        self.scan_status_label.SetLabel(message)
+        self.scan_status_label.GetParent().Layout()
+        
+        if self._accessibility is None:
+            self._accessibility = AccessibilityUtils()
+        self._accessibility.announce_to_screen_reader(message)
+    
     def _restore_scan_button(self, button):
         """恢复搜索按钮"""
         button.Enable(True)
@@ -505,6 +581,14 @@ class ConfigDialog(wx.Dialog):
         """音效停止事件处理"""
         self.sound_manager.stop_sound_effect()
     
+    def _on_destroy(self, event):
+        """对话框销毁时停止后台搜索及其音效"""
+        if event.GetEventObject() is self:
+            self._scan_stop.set()
+            if self._scan_thread and self._scan_thread.is_alive():
+                self.sound_manager.stop_sound_effect()
+        event.Skip()
+    
     def on_save(self, event):
         """保存配置"""
         try:
@@ -548,47 +632,36 @@ class ConfigDialog(wx.Dialog):
             self.server_address_text.SetFocus()
             return False
         
-        # 检查Web端口（如果填写了）
-        web_port = self.web_port_text.GetValue().strip()
-        if web_port:
-            try:
-                web_port = int(web_port)
-                if not (1 <= web_port <= 65535):
-                    wx.MessageBox("Web端口必须在1-65535之间", "提示", wx.OK | wx.ICON_INFORMATION)
-                    self.web_port_text.SetFocus()
-                    return False
-            except ValueError:
-                wx.MessageBox("Web端口必须是数字", "提示", wx.OK | wx.ICON_INFORMATION)
-                self.web_port_text.SetFocus()
-                return False
-        
-        # 检查合成端口（如果填写了）
-        synth_port = self.synth_port_text.GetValue().strip()
-        if synth_port:
-            try:
-                synth_port = int(synth_port)
-                if not (1 <= synth_port <= 65535):
-                    wx.MessageBox("合成端口必须在1-65535之间", "提示", wx.OK | wx.ICON_INFORMATION)
-                    self.synth_port_text.SetFocus()
-                    return False
-            except ValueError:
-                wx.MessageBox("合成端口必须是数字", "提示", wx.OK | wx.ICON_INFORMATION)
-                self.synth_port_text.SetFocus()
-                return False
+        # 检查Web端口和合成端口（如果填写了）
+        if not self._check_port(self.web_port_text, "Web端口"):
+            return False
+        
+        if not self._check_port(self.synth_port_text, "合成端口"):
+            return False
         
         # 检查超时时间
         timeout_str = self.timeout_text.GetValue().strip()
-        if timeout_str:
-            try:
-                timeout = int(timeout_str)
-                if timeout < 0:
-                    wx.MessageBox("超时时间不能为负数", "提示", wx.OK | wx.ICON_INFORMATION)
-                    self.timeout_text.SetFocus()
-                    return False
-            except ValueError:
-                wx.MessageBox("超时时间必须是整数", "提示", wx.OK | wx.ICON_INFORMATION)
-                self.timeout_text.SetFocus()
-                return False
+        if timeout_str and not timeout_str.isdecimal():
+            if timeout_str.startswith('-') and timeout_str[1:].isdecimal():
+                message = "超时时间不能为负数"
+            else:
+                message = "超时时间必须是整数"
+            wx.MessageBox(message, "提示", wx.OK | wx.ICON_INFORMATION)
+            self.timeout_text.SetFocus()
+            return False
+        
+        return True
+    
+    def _check_port(self, ctrl, label):
+        """检查端口输入框，留空视为有效"""
+        value = ctrl.GetValue().strip()
+        if not value:
+            return True
+        
+        if not _PORT_RE.match(value) or int(value) > 65535:
+            wx.MessageBox(f"{label}必须是1-65535的数字", "提示", wx.OK | wx.ICON_INFORMATION)
+            ctrl.SetFocus()
+            return False
         
         return True
     
@@ -611,7 +684,7 @@ class ConfigDialog(wx.Dialog):
             'type': self.type_combo.GetValue(),
             'custom_name': self.name_text.GetValue().strip(),
             'enabled': True,
-            'created_time': time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'created_time': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
             'last_used': None
         }
         
@@ -644,9 +717,12 @@ class ConfigDialog(wx.Dialog):
         """获取配置数据"""
         return self.config_data
     
-    def _on_list_key_down(self, event, dialog, servers, list_ctrl):
+    def _on_list_key_down(self, event):
         """处理服务器列表的键盘事件"""
         try:
+            list_ctrl = event.GetEventObject()
+            dialog = list_ctrl.GetParent()
+            
             # 获取按键代码
             key_code = event.GetKeyCode()
             
@@ -657,7 +733,6 @@ class ConfigDialog(wx.Dialog):
                 
                 if focused_item != -1:
                     # 光标在某一行上，直接返回该行的服务器
-                    chosen_server = servers[focused_item]
                     dialog.EndModal(wx.ID_OK)
                     return
             
@@ -667,30 +742,7 @@ class ConfigDialog(wx.Dialog):
                 dialog.EndModal(wx.ID_CANCEL)
                 return
             
-            # 处理上下键移动光标
-            elif key_code == wx.WXK_UP:
-                # 向上移动光标并自动获得焦点
-                focused_item = list_ctrl.GetFocusedItem()
-                if focused_item > 0:
-                    # 清除原来的焦点和选中状态
-                    list_ctrl.SetItemState(focused_item, 0, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED)
-                    # 设置新的焦点和选中状态
-                    list_ctrl.SetItemState(focused_item - 1, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED)
-                    list_ctrl.EnsureVisible(focused_item - 1)
-                return
-            
-            elif key_code == wx.WXK_DOWN:
-                # 向下移动光标并自动获得焦点
-                focused_item = list_ctrl.GetFocusedItem()
-                if focused_item < list_ctrl.GetItemCount() - 1:
-                    # 清除原来的焦点和选中状态
-                    list_ctrl.SetItemState(focused_item, 0, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED)
-                    # 设置新的焦点和选中状态
-                    list_ctrl.SetItemState(focused_item + 1, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED, wx.LIST_STATE_FOCUSED | wx.LIST_STATE_SELECTED)
-                    list_ctrl.EnsureVisible(focused_item + 1)
-                return
-            
-            # 其他按键交给默认处理
+            # 其他按键（包括上下键，由列表原生移动选中行）交给默认处理
             event.Skip()
             
         except Exception as e:
@@ -32,8 +32,8 @@ class MainFrame(wx.Frame):
         """初始化主窗口"""
         super().__init__(parent, title=title, size=(900, 700))
         
-        # 初始化管理器
-        self.provider_manager = ProviderManager()
+        # 初始化管理器（优先复用应用在后台线程中创建的提供商管理器）
+        self.provider_manager = getattr(wx.GetApp(), 'provider_manager', None) or ProviderManager()
         self.tts_client = TTSClient()
         self.json_exporter = JSONExporter()
         self.network_scanner = NetworkScanner()
@@ -48,6 +48,10 @@ class MainFrame(wx.Frame):
         self.last_announcement_time = {}
         self.announcement_delay = 200  # 毫秒
         
+        # 输入验证防抖：连续输入时只在停止输入后验证一次
+        self._debounce_timers: Dict[str, wx.CallLater] = {}
+        self.validate_delay = 150  # 毫秒
+        
         # 播放状态控制
         self.is_playing = False
         self.is_loading = False
@@ -559,9 +563,25 @@ class MainFrame(wx.Frame):
             announcement = f"{control_type} {value:.1f}"
             self.accessibility.announce_to_screen_reader(announcement)
     
+    def _schedule(self, key, delay, func):
+        """防抖调度：delay毫秒内重复调度只在最后一次之后执行func"""
+        timer = self._debounce_timers.get(key)
+        if timer and timer.IsRunning():
+            timer.Restart(delay)
+        else:
+            self._debounce_timers[key] = wx.CallLater(delay, func)
+    
     def on_speed_text_changed(self, event):
         """语速文本改变事件"""
-        # 这个事件在每次按键时触发，我们在这里进行验证
+        # 这个事件在每次按键时触发，验证推迟到停止输入后进行
+        self._schedule('speed', self.validate_delay, self._do_speed_validate)
+        event.Skip()
+    
+    def _do_speed_validate(self):
+        """验证语速输入（防抖后执行）"""
+        if not self.speed_text:
+            return
+        
         text_str = self.speed_text.GetValue()
         
         # 如果输入为空，暂时不做验证
@@ -573,18 +593,11 @@ class MainFrame(wx.Frame):
         
         # 如果无效，需要修正
         if not valid:
-            # 使用CallAfter避免在事件处理中修改控件
-            wx.CallAfter(self.speed_text.SetValue, formatted)
-            wx.CallAfter(self.speed_text.SetInsertionPointEnd)
+            self.speed_text.SetValue(formatted)
+            self.speed_text.SetInsertionPointEnd()
         
         # 播报数值变化
-        try:
-            value = float(formatted)
-            self._announce_value_change("语速", value)
-        except (ValueError, TypeError):
-            pass
-        
-        event.Skip()
+        self._announce_value_change("语速", float(formatted))
     
     def on_speed_text_enter(self, event):
         """语速文本按Enter键事件"""
@@ -649,7 +662,15 @@ class MainFrame(wx.Frame):
     
     def on_volume_text_changed(self, event):
         """音量文本改变事件"""
-        # 这个事件在每次按键时触发，我们在这里进行验证
+        # 这个事件在每次按键时触发，验证推迟到停止输入后进行
+        self._schedule('volume', self.validate_delay, self._do_volume_validate)
+        event.Skip()
+    
+    def _do_volume_validate(self):
+        """验证音量输入（防抖后执行）"""
+        if not self.volume_text:
+            return
+        
         text_str = self.volume_text.GetValue()
         
         # 如果输入为空，暂时不做验证
@@ -661,18 +682,11 @@ class MainFrame(wx.Frame):
         
         # 如果无效，需要修正
         if not valid:
-            # 使用CallAfter避免在事件处理中修改控件
-            wx.CallAfter(self.volume_text.SetValue, formatted)
-            wx.CallAfter(self.volume_text.SetInsertionPointEnd)
+            self.volume_text.SetValue(formatted)
+            self.volume_text.SetInsertionPointEnd()
         
         # 播报数值变化
-        try:
-            value = float(formatted)
-            self._announce_value_change("音量", value)
-        except (ValueError, TypeError):
-            pass
-        
-        event.Skip()
+        self._announce_value_change("音量", float(formatted))
     
     def on_volume_text_enter(self, event):
         """音量文本按Enter键事件"""
@@ -896,6 +910,12 @@ class MainFrame(wx.Frame):
     def _stop_all_threads(self):
         """停止所有正在运行的线程"""
         try:
+            # 停止尚未触发的防抖定时器，避免窗口销毁后回调访问已销毁的控件
+            for timer in self._debounce_timers.values():
+                if timer.IsRunning():
+                    timer.Stop()
+            self._debounce_timers.clear()
+            
             # 停止试听相关的线程
             if hasattr(self, 'preview_button'):
                 self.preview_button.Enable(True)
@@ -29,7 +29,8 @@ class ProviderDialog(wx.Dialog):
         
         # 初始化管理器
         self.provider_manager = ProviderManager()
-        self.network_scanner = NetworkScanner()
+        # 复用主窗口的网络扫描器，已知服务器等缓存在多次搜索之间共享
+        self.network_scanner = getattr(parent, 'network_scanner', None) or NetworkScanner()
         
         # 当前选中的方案
         self.selected_provider = None
@@ -232,6 +233,7 @@ class ProviderDialog(wx.Dialog):
                 
                 # 保存方案
                 self.provider_manager.add_provider(config_data)
+                self.network_scanner.invalidate_known_servers()
                 
                 # 重新加载列表
                 self._load_providers()
@@ -262,6 +264,7 @@ class ProviderDialog(wx.Dialog):
                 # 更新方案
                 provider_id = self.selected_provider.get('id')
                 self.provider_manager.update_provider(provider_id, config_data)
+                self.network_scanner.invalidate_known_servers()
                 
                 # 重新加载列表
                 self._load_providers()
@@ -295,6 +298,7 @@ class ProviderDialog(wx.Dialog):
                 # 删除方案
                 provider_id = self.selected_provider.get('id')
                 self.provider_manager.delete_provider(provider_id)
+                self.network_scanner.invalidate_known_servers()
                 
                 # 清空选择
                 self.selected_provider = None
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务器列表控件
+使用 wx.LC_VIRTUAL 虚拟列表，行文本按需从预先构建的表格中读取
+"""
+
+import wx
+from typing import List, Sequence
+
+
+class ServerListCtrl(wx.ListCtrl):
+    """虚拟模式的服务器列表控件
+
+    不逐行InsertItem/SetItem，只在控件需要绘制或读屏软件查询时通过OnGetItemText取值
+    """
+
+    def __init__(self, parent, columns: Sequence[tuple], **kwargs):
+        """初始化服务器列表
+
+        Args:
+            parent: 父窗口
+            columns: 列定义，每项为 (标题, 宽度)
+            **kwargs: 其他参数
+        """
+        kwargs['style'] = kwargs.get('style', wx.LC_REPORT | wx.LC_SINGLE_SEL) | wx.LC_VIRTUAL
+        super().__init__(parent, **kwargs)
+
+        for index, (title, width) in enumerate(columns):
+            self.InsertColumn(index, title, width=width)
+
+        self._rows = []
+
+    def set_rows(self, rows: List[Sequence[str]]):
+        """设置全部行数据，每行为各列文本组成的序列"""
+        self._rows = rows
+        self.SetItemCount(len(rows))
+        self.Refresh()
+
+    def OnGetItemText(self, item, col):
+        """虚拟列表回调：返回指定单元格的文本"""
+        return self._rows[item][col]